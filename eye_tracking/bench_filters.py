@@ -0,0 +1,122 @@
+# eye_tracking/bench_filters.py
+# ==============================
+# Retard et tremblement des filtres de regard vs l'ancienne moyenne glissante.
+#
+# Usage :
+#   python -m eye_tracking.bench_filters                    # trajectoire synthétique (vérité terrain)
+#   python -m eye_tracking.bench_filters session.npz       # cache de landmarks écrit par replay --cache
+#
+# Synthétique : fixations + saccades bruitées à ~30 FPS irrégulier.
+#   lag    : temps pour atteindre 90 % de l'amplitude après chaque saccade (médiane)
+#   jitter : écart RMS à la vérité pendant les fixations établies
+# Enregistrement (pas de vérité) :
+#   lag    : décalage maximisant la corrélation des vitesses filtrée / brute
+#   jitter : déplacement RMS d'une frame à l'autre pendant les fixations
+
+import argparse
+
+import numpy as np
+
+from eye_tracking.filters import KalmanFilter, MovingAverageFilter, OneEuroFilter
+
+CANDIDATES = [
+    ("moving_average (legacy)", lambda: MovingAverageFilter()),
+    ("one_euro", lambda: OneEuroFilter()),
+    ("one_euro beta=0.05", lambda: OneEuroFilter(beta=0.05)),
+    ("kalman", lambda: KalmanFilter()),
+]
+
+
+def synthetic(seconds=120, fps=30.0, noise=2.0, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(seconds * fps)
+    t = np.cumsum(rng.normal(1 / fps, 0.1 / fps, n).clip(0.3 / fps))
+    truth = np.zeros((n, 2))
+    onsets = []
+    pos = np.array([320.0, 240.0])
+    next_saccade = 0.0
+    for i, ti in enumerate(t):
+        if ti >= next_saccade:
+            pos = np.array([320.0, 240.0]) + rng.uniform(-60, 60, 2)
+            onsets.append(i)
+            next_saccade = ti + rng.uniform(0.5, 1.5)
+        truth[i] = pos
+    raw = truth + rng.normal(0, noise, truth.shape)
+    return t, raw, truth, onsets[1:]
+
+
+def recorded(path):
+    from eye_tracking.landmarks import LandmarkFrame
+    from eye_tracking.replay import LandmarkSource
+    source = LandmarkSource(path)
+    frame = LandmarkFrame()
+    t, raw = [], []
+    for ti, lms in source:
+        if lms is None:
+            continue
+        frame.fill_array(lms, source.width, source.height, source.rows)
+        t.append(ti)
+        raw.append(frame.iris_center().copy())
+    return np.array(t), np.array(raw, dtype=np.float64)
+
+
+def run_filter(f, t, raw):
+    out = np.empty_like(raw)
+    for i in range(len(t)):
+        out[i] = f(raw[i], t[i])
+    return out
+
+
+def synthetic_metrics(t, out, truth, onsets):
+    lags = []
+    settled = np.zeros(len(t), dtype=bool)
+    for k, i in enumerate(onsets):
+        end = onsets[k + 1] if k + 1 < len(onsets) else len(t)
+        start_pos, target = truth[i - 1], truth[i]
+        amp = np.linalg.norm(target - start_pos)
+        progress = (out[i:end] - start_pos) @ (target - start_pos) / max(amp ** 2, 1e-9)
+        reached = np.nonzero(progress >= 0.9)[0]
+        if len(reached):
+            lags.append(t[i + reached[0]] - t[i])
+        settled[i:end] = t[i:end] - t[i] > 0.3
+    jitter = np.sqrt(np.mean(np.sum((out[settled] - truth[settled]) ** 2, axis=1)))
+    return np.median(lags) * 1000, jitter
+
+
+def recorded_metrics(t, out, raw, fps):
+    v_raw = np.linalg.norm(np.diff(raw, axis=0), axis=1)
+    v_out = np.linalg.norm(np.diff(out, axis=0), axis=1)
+    a = v_raw - v_raw.mean()
+    b = v_out - v_out.mean()
+    shifts = range(0, 15)
+    corr = [np.dot(a[:len(a) - s], b[s:]) for s in shifts]
+    lag_ms = shifts[int(np.argmax(corr))] / fps * 1000
+    fixation = v_raw < np.percentile(v_raw, 70)
+    jitter = np.sqrt(np.mean(v_out[fixation] ** 2))
+    return lag_ms, jitter
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cache", nargs="?", help=".npz landmark cache (default: synthetic trajectory)")
+    args = parser.parse_args()
+
+    if args.cache:
+        t, raw = recorded(args.cache)
+        fps = (len(t) - 1) / (t[-1] - t[0])
+        print(f"{len(t)} frames with a face, {fps:.1f} fps")
+    else:
+        t, raw, truth, onsets = synthetic()
+        print(f"synthetic: {len(t)} frames, {len(onsets)} saccades, noise sigma 2 px")
+
+    for name, make in CANDIDATES:
+        out = run_filter(make(), t, raw)
+        if args.cache:
+            lag, jitter = recorded_metrics(t, out, raw, fps)
+        else:
+            lag, jitter = synthetic_metrics(t, out, truth, onsets)
+        print(f"{name:<24} lag {lag:6.1f} ms   jitter {jitter:5.2f} px")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# eye_tracking/bench_frame_path.py
+# =================================
+# Coût par frame de la préparation de l'image avant FaceMesh :
+# ancienne version (cv2.flip + cv2.cvtColor alloués à chaque frame)
+# vs conversion dans un tampon préalloué (dst=) sans retournement.
+#
+# Usage : python -m eye_tracking.bench_frame_path [--frames 2000] [--width 640] [--height 480]
+
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from eye_tracking.landmarks import LandmarkFrame
+from eye_tracking.roi import FrameBuffers, to_rgb
+
+
+def legacy_path(bgr):
+    frame = cv2.flip(bgr, 1)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def measure(name, fn, frames):
+    for bgr in frames[:20]:
+        fn(bgr)                                     # chauffe
+
+    start = time.perf_counter()
+    for bgr in frames:
+        fn(bgr)
+    us = (time.perf_counter() - start) / len(frames) * 1e6
+
+    tracemalloc.start()
+    peak = 0
+    for bgr in frames[:200]:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn(bgr)
+        peak += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    print(f"{name:<26} {us:8.1f} us/frame   peak alloc {peak / min(len(frames), 200):10.0f} B/frame")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Quelques images distinctes, réutilisées comme le ferait l'anneau de capture
+    pool = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(3)]
+    frames = [pool[i % len(pool)] for i in range(args.frames)]
+
+    buffers = FrameBuffers(maxsize=1)
+    landmarks = LandmarkFrame()
+
+    def zero_copy(bgr):
+        rgb = to_rgb(bgr, buffers)
+        landmarks.mirror(args.width)                # miroir en espace landmarks
+        return rgb
+
+    print(f"{args.frames} frames {args.width}x{args.height}")
+    measure("flip + cvtColor (legacy)", legacy_path, frames)
+    measure("cvtColor dst= + mirror", zero_copy, frames)
+
+    # Le résultat doit être identique à un retournement près
+    a = legacy_path(frames[0])
+    b = to_rgb(frames[0], buffers)
+    assert np.array_equal(a[:, ::-1], b), "RGB output differs"
+
+
+if __name__ == "__main__":
+    main()
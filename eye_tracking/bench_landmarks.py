@@ -0,0 +1,108 @@
+# eye_tracking/bench_landmarks.py
+# ================================
+# Micro-benchmark du coût par frame de l'étage landmarks :
+# ancienne version (listes de tuples + deque) vs LandmarkFrame vectorisé.
+#
+# Usage : python -m eye_tracking.bench_landmarks [--frames 5000]
+
+import argparse
+import time
+import tracemalloc
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+
+from eye_tracking.landmarks import (LEFT_EYE, LEFT_IRIS, NUM_LANDMARKS, RIGHT_EYE,
+                                    RIGHT_IRIS, LandmarkFrame, PositionHistory)
+
+W, H = 640, 480
+
+
+def fake_landmarks(rng):
+    pts = rng.random((NUM_LANDMARKS, 3), dtype=np.float32)
+    return [SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in pts]
+
+
+# --- Ancienne implémentation (eye_module avant vectorisation) ---
+
+def legacy_ear(landmarks, eye_points, w, h):
+    pts = []
+    for idx in eye_points:
+        lm = landmarks[idx]
+        pts.append((int(lm.x * w), int(lm.y * h)))
+    pts = np.array(pts)
+    v1 = np.linalg.norm(pts[1] - pts[5])
+    v2 = np.linalg.norm(pts[2] - pts[4])
+    hdist = np.linalg.norm(pts[0] - pts[3])
+    return (v1 + v2) / (2.0 * hdist)
+
+
+def legacy_frame(landmarks, history):
+    ear = (legacy_ear(landmarks, LEFT_EYE, W, H) + legacy_ear(landmarks, RIGHT_EYE, W, H)) / 2.0
+    ir, il = landmarks[RIGHT_IRIS], landmarks[LEFT_IRIS]
+    history.append((int((ir.x + il.x) / 2 * W), int((ir.y + il.y) / 2 * H)))
+    x = int(sum(p[0] for p in history) / len(history))
+    y = int(sum(p[1] for p in history) / len(history))
+    return ear, (x, y)
+
+
+def vectorized_frame(landmarks, frame, history):
+    frame.fill(landmarks, W, H)
+    ear_l, ear_r = frame.ear()
+    history.append(frame.iris_center())
+    x, y = history.mean()
+    return (ear_l + ear_r) / 2.0, (x, y)
+
+
+def measure(name, fn, frames):
+    for lms in frames[:50]:
+        fn(lms)                                  # chauffe
+
+    t0 = time.perf_counter()
+    for lms in frames:
+        fn(lms)
+    elapsed = time.perf_counter() - t0
+
+    # Allocations : pic de mémoire tracée pendant une frame, en moyenne
+    tracemalloc.start()
+    peaks = 0
+    for lms in frames[:500]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(lms)
+        peaks += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    print(f"{name:12s} {elapsed / len(frames) * 1e6:8.1f} µs/frame   "
+          f"peak alloc: {peaks / min(500, len(frames)):7.0f} B/frame")
+
+
+def measure_stage(name, fn, frames):
+    t0 = time.perf_counter()
+    for lms in frames:
+        fn(lms)
+    print(f"{name:12s} {(time.perf_counter() - t0) / len(frames) * 1e6:8.1f} µs/frame")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pool = [fake_landmarks(rng) for _ in range(20)]
+    frames = [pool[i % len(pool)] for i in range(args.frames)]
+
+    legacy_history = deque(maxlen=10)
+    frame, history = LandmarkFrame(), PositionHistory(maxlen=10)
+
+    measure("legacy", lambda lms: legacy_frame(lms, legacy_history), frames)
+    measure("vectorized", lambda lms: vectorized_frame(lms, frame, history), frames)
+
+    # Détail : extraction des lignes suivies vs calcul EAR + iris seul
+    measure_stage("fill only", lambda lms: frame.fill(lms, W, H), frames)
+    measure_stage("math only", lambda lms: (frame.ear(), frame.iris_center(), history.mean()), frames)
+
+
+if __name__ == "__main__":
+    main()
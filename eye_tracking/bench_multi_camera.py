@@ -0,0 +1,60 @@
+# eye_tracking/bench_multi_camera.py
+# ===================================
+# Débit d'inférence avec 1, 2, 4 caméras simulées (même vidéo lue par
+# chaque session) : un processus par caméra vs des threads dans un seul
+# processus. La vidéo est lue sans cadence imposée : on mesure le débit
+# maximal de chaque session, pas 30 FPS plafonnés par la caméra.
+#
+# Usage : python -m eye_tracking.bench_multi_camera video.mp4 [--counts 1 2 4] [--duration 20] [--threads]
+
+import argparse
+import time
+
+from eye_tracking.multi_camera import MultiCameraCoordinator
+
+
+def summarize(label, n, stats):
+    fps = [s["inference"]["fps"] for s in stats.values() if s]
+    p95 = [s["inference"]["p95_ms"] for s in stats.values() if s]
+    if not fps:
+        print(f"{label:<10} {n} cameras: no stats (video too short or camera unavailable)")
+        return
+    print(f"{label:<10} {n} cameras: total {sum(fps):7.1f} fps  per camera {min(fps):5.1f}-{max(fps):5.1f} fps  "
+          f"inference p95 {max(p95):6.1f} ms")
+
+
+def run_processes(video, n, duration):
+    coordinator = MultiCameraCoordinator({f"cam-{i}": video for i in range(n)},
+                                         on_command=lambda *a: None, stats_every=1.0).start()
+    time.sleep(duration)
+    stats = dict(coordinator.stats)             # stats à régime établi, avant l'arrêt
+    coordinator.stop()
+    summarize("processes", n, stats)
+
+
+def run_threads(video, n, duration):
+    from eye_tracking.eye_module import EyeTracker
+    trackers = [EyeTracker(f"cam-{i}", video, stats_every=0).start() for i in range(n)]
+    time.sleep(duration)
+    stats = {t.session_id: t.stats() for t in trackers}
+    for t in trackers:
+        t.stop()
+    summarize("threads", n, stats)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video", help="recording read by every simulated camera (longer than --duration)")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--threads", action="store_true", help="also run all sessions as threads in one process")
+    args = parser.parse_args()
+
+    for n in args.counts:
+        run_processes(args.video, n, args.duration)
+        if args.threads:
+            run_threads(args.video, n, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# eye_tracking/bench_roi.py
+# ==========================
+# Coût par frame de FaceMesh sur une vidéo enregistrée :
+# image complète vs région d'intérêt (avec et sans résolution adaptative).
+#
+# Usage : python -m eye_tracking.bench_roi video.mp4 [--frames 600] [--budget-ms 33]
+#
+# Temps mur et temps CPU du processus par frame, taux de détection, et
+# écart moyen du centre des iris par rapport au passage image complète.
+
+import argparse
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from eye_tracking.landmarks import LandmarkFrame
+from eye_tracking.roi import RoiTracker
+
+
+def load_frames(path, limit):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def new_face_mesh():
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=False,
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7,
+    )
+
+
+def run(name, frames, process):
+    """process(frame, landmark_frame) -> bool ; retourne les centres d'iris (NaN si absent)"""
+    lm = LandmarkFrame()
+    centers = np.full((len(frames), 2), np.nan)
+    wall = []
+    cpu_start = time.process_time()
+    for i, frame in enumerate(frames):
+        t0 = time.perf_counter()
+        if process(frame, lm):
+            centers[i] = lm.iris_center()
+        wall.append(time.perf_counter() - t0)
+    cpu = time.process_time() - cpu_start
+
+    wall_ms = np.array(wall) * 1000
+    detected = np.count_nonzero(~np.isnan(centers[:, 0]))
+    print(f"{name:<16} {wall_ms.mean():7.2f} ms/frame  p95 {np.percentile(wall_ms, 95):7.2f} ms  "
+          f"cpu {cpu / len(frames) * 1000:7.2f} ms/frame  detected {detected}/{len(frames)}")
+    return centers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--budget-ms", type=float, default=33.0)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    if not frames:
+        raise SystemExit(f"no frames read from {args.video}")
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frames {w}x{h}")
+
+    full_mesh = new_face_mesh()
+
+    def full(frame, lm):
+        res = full_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if not res.multi_face_landmarks:
+            return False
+        lm.fill(res.multi_face_landmarks[0].landmark, w, h)
+        return True
+
+    reference = run("full frame", frames, full)
+
+    for name, levels in (("roi", (1.0,)), ("roi + adaptive", None)):
+        mesh = new_face_mesh()
+        roi = RoiTracker(budget_ms=args.budget_ms) if levels is None else \
+            RoiTracker(budget_ms=args.budget_ms, levels=levels)
+        centers = run(name, frames, lambda frame, lm: roi.process(mesh, frame, lm))
+        err = np.linalg.norm(centers - reference, axis=1)
+        print(f"{'':<16} iris error vs full: mean {np.nanmean(err):.2f} px  "
+              f"max {np.nanmax(err):.2f} px  {roi.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# eye_tracking/blink.py
+# ======================
+# Détection des clignements en flux d'événements, sur les horodatages de
+# capture : les règles portent sur des durées (secondes), pas sur un
+# nombre de frames, donc la sensibilité ne dépend plus de la cadence.
+#
+#   blinks = BlinkDetector(AdaptiveEarThreshold(initial_open=profile.ear_open))
+#   for event in blinks.update(ear, t):
+#       if event.kind == DOUBLE: ...
+#
+# Le seuil EAR s'adapte au patient : il suit le niveau "œil ouvert"
+# observé (moyenne glissante des frames au-dessus du seuil) au lieu du
+# 0.22 fixe, qui est trop haut ou trop bas selon la morphologie et l'angle.
+
+from dataclasses import dataclass
+
+SINGLE = "single"
+DOUBLE = "double"
+LONG = "long"
+
+
+@dataclass
+class BlinkEvent:
+    kind: str               # SINGLE, DOUBLE ou LONG
+    timestamp: float        # capture : fin de fermeture (SINGLE, DOUBLE), seuil long_blink atteint (LONG)
+    duration: float         # durée de fermeture (du dernier clignement pour DOUBLE)
+    confidence: float       # 0..1 : profondeur de fermeture sous le seuil
+
+
+class AdaptiveEarThreshold:
+    """
+    threshold = ratio * niveau œil ouvert, borné dans [minimum, maximum].
+    Tant que `warmup` frames ouvertes n'ont pas été vues (et sans niveau
+    connu du profil), le seuil fixe `fallback` est utilisé.
+    """
+
+    def __init__(self, initial_open=None, ratio=0.75, alpha=0.01, warmup=30,
+                 fallback=0.22, minimum=0.12, maximum=0.30):
+        self.ratio = ratio
+        self.alpha = alpha
+        self.warmup = warmup
+        self.fallback = fallback
+        self.minimum = minimum
+        self.maximum = maximum
+        self.open_level = initial_open
+        self.samples = warmup if initial_open is not None else 0
+
+    @property
+    def value(self):
+        if self.open_level is None or self.samples < self.warmup:
+            return self.fallback
+        return min(self.maximum, max(self.minimum, self.ratio * self.open_level))
+
+    def update(self, ear):
+        # Seules les frames œil ouvert nourrissent l'estimation
+        if ear <= self.value:
+            return
+        self.samples += 1
+        if self.open_level is None:
+            self.open_level = ear
+        else:
+            self.open_level += self.alpha * (ear - self.open_level)
+
+
+class BlinkDetector:
+    """
+    Règles (en secondes) :
+      - fermeture < min_blink            : bruit, ignorée
+      - min_blink ≤ fermeture ≤ max_blink : clignement
+      - fermeture ≥ long_blink           : LONG, émis dès que la durée est atteinte
+      - deux clignements séparés de moins de double_gap : DOUBLE
+      - un clignement isolé devient SINGLE quand double_gap est écoulé
+      - une interruption du flux de plus de max_frame_gap annule la fermeture en cours
+    """
+
+    def __init__(self, threshold=None, min_blink=0.05, max_blink=0.5, long_blink=0.8,
+                 double_gap=1.0, max_frame_gap=0.25):
+        self.threshold = threshold or AdaptiveEarThreshold()
+        self.min_blink = min_blink
+        self.max_blink = max_blink
+        self.long_blink = long_blink
+        self.double_gap = double_gap
+        self.max_frame_gap = max_frame_gap
+
+        self._closed_since = None
+        self._min_ear = None
+        self._long_sent = False
+        self._pending = None            # clignement isolé en attente d'un éventuel second
+        self._last_t = None
+
+    def _confidence(self, min_ear, threshold):
+        # Fermeture franche (EAR à mi-seuil ou moins) → 1.0
+        return max(0.0, min(1.0, (threshold - min_ear) / (0.5 * threshold)))
+
+    def update(self, ear, t):
+        """Retourne les événements conclus à cette frame (liste souvent vide)"""
+        events = []
+        if self._last_t is not None and t - self._last_t > self.max_frame_gap:
+            # Trou dans le flux : la durée de la fermeture en cours est inconnue
+            self._closed_since = None
+        self._last_t = t
+
+        threshold = self.threshold.value
+        if ear < threshold:
+            if self._closed_since is None:
+                self._closed_since = t
+                self._min_ear = ear
+                self._long_sent = False
+            else:
+                self._min_ear = min(self._min_ear, ear)
+            duration = t - self._closed_since
+            if duration >= self.long_blink and not self._long_sent:
+                self._long_sent = True
+                self._pending = None
+                events.append(BlinkEvent(LONG, t, duration, self._confidence(self._min_ear, threshold)))
+        else:
+            self.threshold.update(ear)
+            if self._closed_since is not None:
+                duration = t - self._closed_since
+                if self.min_blink <= duration <= self.max_blink:
+                    confidence = self._confidence(self._min_ear, threshold)
+                    if self._pending is not None and self._closed_since - self._pending.timestamp <= self.double_gap:
+                        events.append(BlinkEvent(DOUBLE, t, duration, min(confidence, self._pending.confidence)))
+                        self._pending = None
+                    else:
+                        self._pending = BlinkEvent(SINGLE, t, duration, confidence)
+                self._closed_since = None
+
+        if self._pending is not None and self._closed_since is None and t - self._pending.timestamp > self.double_gap:
+            events.append(self._pending)
+            self._pending = None
+        return events
@@ -0,0 +1,229 @@
+# eye_tracking/calibration.py
+# ============================
+# Profils de calibration du regard, un par patient, partagés par
+# eye_module et smartvision_comunica2.
+#
+# Un profil ne garde que des statistiques (centre, décalage moyen vers
+# chaque direction, dispersion au centre), pas les échantillons bruts :
+# un petit JSON par patient, chargé en quelques millisecondes.
+# Pendant l'utilisation, le centre et les décalages suivent lentement la
+# dérive de la tête (moyenne glissante exponentielle).
+
+import json
+import math
+import os
+import re
+import threading
+import time
+
+from eye_tracking.filters import DEFAULT_FILTER
+
+CALIBRATION_DIR = os.environ.get("CALIBRATION_DIR", "calibration_profiles")
+
+DIRECTIONS = ("center", "up", "down", "left", "right")
+# Axe et signe de chaque direction dans l'image (y vers le bas)
+AXES = {"up": (1, -1), "down": (1, 1), "left": (0, -1), "right": (0, 1)}
+
+DEFAULT_OFFSETS = {"up": 40.0, "down": 40.0, "left": 50.0, "right": 50.0}
+THRESHOLD_RATIO = 0.5       # seuil à mi-chemin entre le centre et la cible
+NOISE_FACTOR = 3.0          # ... mais jamais sous 3 écarts-types du bruit au centre
+MIN_THRESHOLD = 5.0         # pixels
+
+# Suivi du centre : constante de temps (≈ ancien alpha 0.02 par frame à
+# 30 fps), zone morte en distance normalisée (1.0 = seuil) et pas de temps
+# maximal pris en compte après une interruption (visage perdu, transition)
+CENTER_TAU = 1.65           # secondes
+CENTER_DEADZONE = 0.3
+CENTER_MAX_DT = 0.1         # secondes
+
+
+def _mean(points):
+    n = len(points)
+    return (sum(p[0] for p in points) / n, sum(p[1] for p in points) / n)
+
+
+def _std(values):
+    n = len(values)
+    if n < 2:
+        return 0.0
+    m = sum(values) / n
+    return (sum((v - m) ** 2 for v in values) / (n - 1)) ** 0.5
+
+
+class CalibrationProfile:
+    """
+    Calibration d'un patient.
+
+        profile = CalibrationProfile.from_samples("p-042", samples)   # 5 listes de (x, y)
+        direction = profile.direction((x, y))                        # "center", "up", ...
+        profile.update((x, y), direction, t)                         # raffinement en ligne
+    """
+
+    def __init__(self, patient_id, center=None, offsets=None, noise=(0.0, 0.0), alpha=0.02,
+                 gaze_filter=None, ear_open=None, center_tau=CENTER_TAU):
+        self.patient_id = patient_id
+        self.center = center                        # (x, y) ou None si jamais calibré
+        self.offsets = dict(DEFAULT_OFFSETS, **(offsets or {}))   # distance centre → cible
+        self.noise = noise                          # écart-type (x, y) au centre
+        self.alpha = alpha                          # poids d'une direction confirmée en ligne
+        self.center_tau = center_tau                # constante de temps du suivi du centre (s)
+        # Filtre de lissage du regard et ses paramètres (voir filters.create_filter)
+        self.gaze_filter = dict(gaze_filter or DEFAULT_FILTER)
+        # Niveau EAR œil ouvert appris (seuil de clignement adaptatif), None : inconnu
+        self.ear_open = ear_open
+        self.updates = 0
+        self.dirty = False
+        self._center_t = None                       # dernier échantillon de centre (time.monotonic)
+        self.thresholds = {}
+        self._refresh_thresholds()
+
+    @classmethod
+    def from_samples(cls, patient_id, samples, **kwargs):
+        """samples : {"center": [(x, y), ...], "up": [...], ...} ; directions vides → valeurs par défaut"""
+        center_samples = samples.get("center") or []
+        if not center_samples:
+            raise ValueError("calibration needs center samples")
+        center = _mean(center_samples)
+        noise = (_std([p[0] for p in center_samples]), _std([p[1] for p in center_samples]))
+
+        offsets = {}
+        for d, (axis, sign) in AXES.items():
+            if samples.get(d):
+                offsets[d] = max(MIN_THRESHOLD, sign * (_mean(samples[d])[axis] - center[axis]))
+        profile = cls(patient_id, center, offsets, noise, **kwargs)
+        profile.dirty = True
+        return profile
+
+    def _refresh_thresholds(self):
+        for d, (axis, _) in AXES.items():
+            self.thresholds[d] = max(MIN_THRESHOLD,
+                                     THRESHOLD_RATIO * self.offsets[d],
+                                     NOISE_FACTOR * self.noise[axis])
+
+    def score(self, pos):
+        """
+        Direction dominante et distance au centre normalisée par son seuil
+        (1.0 : exactement sur le seuil). None tant qu'aucun centre n'est connu.
+        """
+        if self.center is None:
+            return None
+        dx = pos[0] - self.center[0]
+        dy = pos[1] - self.center[1]
+        # Distances normalisées par le seuil du côté concerné
+        nx = dx / self.thresholds["left" if dx < 0 else "right"]
+        ny = dy / self.thresholds["up" if dy < 0 else "down"]
+        if abs(nx) > abs(ny):
+            return ("left" if dx < 0 else "right"), abs(nx)
+        return ("up" if dy < 0 else "down"), abs(ny)
+
+    def distance(self, pos, direction):
+        """Distance normalisée vers `direction` (0 si le regard est de l'autre côté)"""
+        axis, sign = AXES[direction]
+        return max(0.0, sign * (pos[axis] - self.center[axis])) / self.thresholds[direction]
+
+    def direction(self, pos):
+        """Direction du regard, ou None tant qu'aucun centre n'est connu"""
+        scored = self.score(pos)
+        if scored is None:
+            return None
+        direction, distance = scored
+        return direction if distance >= 1 else "center"
+
+    def set_center(self, pos):
+        self.center = (float(pos[0]), float(pos[1]))
+        self.dirty = True
+
+    def update(self, pos, direction, t=None):
+        """
+        Raffinement en ligne : au centre, le centre suit la dérive de la
+        tête ; sur une direction confirmée, son décalage est ré-estimé.
+
+        Le suivi du centre dépend du temps écoulé depuis l'échantillon
+        précédent (`t`, time.monotonic), pas du nombre de frames, et ignore
+        les regards hors de la zone morte : un patient qui regarde
+        légèrement de côté ne réduit pas ses propres seuils.
+        """
+        if self.center is None or direction is None:
+            return
+        if direction == "center":
+            if self.score(pos)[1] > CENTER_DEADZONE:
+                return
+            t = time.monotonic() if t is None else t
+            last, self._center_t = self._center_t, t
+            if last is None:
+                return
+            a = 1.0 - math.exp(-min(max(t - last, 0.0), CENTER_MAX_DT) / self.center_tau)
+            cx, cy = self.center
+            self.center = (cx + a * (pos[0] - cx), cy + a * (pos[1] - cy))
+        elif direction in AXES:
+            a = self.alpha
+            axis, sign = AXES[direction]
+            observed = sign * (pos[axis] - self.center[axis])
+            if observed > 0:
+                self.offsets[direction] += a * (observed - self.offsets[direction])
+                self._refresh_thresholds()
+        self.updates += 1
+        self.dirty = True
+
+    def to_dict(self):
+        return {"patient_id": self.patient_id, "center": self.center, "offsets": self.offsets,
+                "noise": self.noise, "alpha": self.alpha, "gaze_filter": self.gaze_filter,
+                "ear_open": self.ear_open, "center_tau": self.center_tau}
+
+    @classmethod
+    def from_dict(cls, data):
+        center = tuple(data["center"]) if data.get("center") is not None else None
+        return cls(data["patient_id"], center, data.get("offsets"),
+                   tuple(data.get("noise", (0.0, 0.0))), data.get("alpha", 0.02),
+                   data.get("gaze_filter"), data.get("ear_open"), data.get("center_tau", CENTER_TAU))
+
+
+class CalibrationStore:
+    """
+    Un fichier JSON par patient dans `directory`, avec un cache en mémoire.
+
+        store = CalibrationStore()
+        profile = store.load("p-042")      # profil vierge si le patient est inconnu
+        store.save(profile)
+    """
+
+    def __init__(self, directory=CALIBRATION_DIR):
+        self.directory = directory
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def path(self, patient_id):
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", str(patient_id))
+        return os.path.join(self.directory, f"{safe}.json")
+
+    def load(self, patient_id) -> CalibrationProfile:
+        with self._lock:
+            profile = self._profiles.get(patient_id)
+            if profile is None:
+                path = self.path(patient_id)
+                if os.path.exists(path):
+                    with open(path, "r") as f:
+                        profile = CalibrationProfile.from_dict(json.load(f))
+                else:
+                    profile = CalibrationProfile(patient_id)
+                self._profiles[patient_id] = profile
+            return profile
+
+    def exists(self, patient_id) -> bool:
+        return patient_id in self._profiles or os.path.exists(self.path(patient_id))
+
+    def save(self, profile: CalibrationProfile):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(profile.patient_id)
+        # Écriture atomique : l'autre module peut relire le même profil
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(profile.to_dict(), f, indent=4)
+        os.replace(tmp, path)
+        with self._lock:
+            self._profiles[profile.patient_id] = profile
+        profile.dirty = False
+
+    def save_if_dirty(self, profile: CalibrationProfile):
+        if profile.dirty and profile.center is not None:
+            self.save(profile)
@@ -0,0 +1,106 @@
+# eye_tracking/capture.py
+# ========================
+# Acquisition caméra sur un thread dédié : on lit au rythme de la caméra
+# directement dans un anneau de tampons préalloués, et le consommateur
+# prend toujours la dernière image. Le traitement ne prend jamais de
+# retard sur le temps réel, même si une frame est plus lente à analyser.
+
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from eye_tracking.ring import SlotRing
+
+
+class FrameGrabber:
+    """
+    Thread de capture « dernière image gagne ».
+
+        grabber = FrameGrabber(0).start()
+        seq = 0
+        while grabber.is_opened():
+            got = grabber.ring.acquire(seq)
+            if got is None:
+                continue
+            slot, seq, t = got
+            process(grabber.ring.buffers[slot])
+            grabber.ring.release(slot)
+    """
+
+    def __init__(self, src=0, width=640, height=480, fps=30, slots=3, max_failures=30):
+        self.src = src
+        # Fichier vidéo : un échec de lecture = fin du fichier, on s'arrête aussitôt
+        self.is_file = isinstance(src, str) and os.path.isfile(src)
+        self.max_failures = max_failures    # échecs consécutifs avant abandon (caméra débranchée)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.slots = slots
+
+        self.ring = None
+        self._cap = None
+        self._running = False
+        self._thread = None
+        self.read_failures = 0
+        self.frames_read = 0            # progression : images reçues de la caméra
+
+    def start(self):
+        self._cap = cv2.VideoCapture(self.src)
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self._cap.set(cv2.CAP_PROP_FPS, self.fps)
+        # Tampon interne minimal : éviter d'accumuler des images périmées
+        self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        # La caméra n'honore pas toujours la résolution demandée :
+        # les tampons prennent la forme de la première image reçue
+        ok, first = self._cap.read() if self._cap.isOpened() else (False, None)
+        shape = first.shape if ok else (self.height, self.width, 3)
+        self.ring = SlotRing([np.empty(shape, dtype=np.uint8) for _ in range(self.slots)])
+        if ok:
+            slot = self.ring.writable()
+            np.copyto(self.ring.buffers[slot], first)
+            self.ring.publish(slot, time.monotonic())
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def is_opened(self) -> bool:
+        return self._running and self._cap is not None and self._cap.isOpened()
+
+    def _run(self):
+        cap, ring = self._cap, self.ring
+        failures = 0
+        while self._running and cap.isOpened():
+            slot = ring.writable()
+            # Décodage directement dans le tampon préalloué
+            ok, _ = cap.read(ring.buffers[slot])
+            if not ok:
+                self.read_failures += 1
+                failures += 1
+                if self.is_file:
+                    print(f"[EYE] End of video file: {self.src}")
+                    break
+                if failures >= self.max_failures:
+                    print(f"[EYE] Camera {self.src}: {failures} failed reads in a row, capture stopped")
+                    break
+                # Pas de boucle à vide : attente croissante, plafonnée à 0.5 s
+                time.sleep(min(0.5, 0.01 * 2 ** failures))
+                continue
+            failures = 0
+            self.frames_read += 1
+            ring.publish(slot, time.monotonic())
+        self._running = False
+        ring.close()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if self._cap is not None:
+            self._cap.release()
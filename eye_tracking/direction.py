@@ -0,0 +1,108 @@
+# eye_tracking/direction.py
+# ==========================
+# Machine à états de la direction du regard, avec hystérésis et temps
+# de maintien, partagée par eye_module et smartvision_comunica2.
+#
+# Au lieu de reclasser chaque frame sur des seuils bruts :
+#   - entrer dans une direction demande de dépasser son seuil (enter),
+#     la quitter demande de redescendre sous une fraction (exit) ;
+#   - une nouvelle direction n'est validée qu'après min_dwell secondes ;
+#   - des événements ne sont émis qu'aux transitions, plus un événement
+#     "dwell" quand la direction est maintenue select_dwell secondes.
+#
+#   tracker = DirectionTracker(profile)
+#   for event in tracker.update(gaze, t):
+#       ...
+
+from dataclasses import dataclass
+
+from eye_tracking.calibration import CalibrationProfile
+
+CHANGE = "change"       # nouvelle direction validée
+DWELL = "dwell"         # direction maintenue assez longtemps pour une sélection
+
+
+@dataclass
+class DirectionEvent:
+    kind: str               # CHANGE ou DWELL
+    direction: str          # "center", "up", "down", "left", "right"
+    previous: str           # direction précédente (CHANGE) ou identique (DWELL)
+    timestamp: float        # horodatage de capture de la frame déclenchante
+    held: float = 0.0       # durée passée dans `previous` (CHANGE) ou dans `direction` (DWELL)
+
+
+class DirectionTracker:
+    """
+    enter / exit : distances normalisées (1.0 = seuil du profil).
+    Avec enter=1.0 et exit=0.7, un regard qui oscille autour du seuil ne
+    fait plus clignoter la sélection.
+    """
+
+    def __init__(self, profile: CalibrationProfile, enter=1.0, exit=0.7,
+                 min_dwell=0.12, select_dwell=0.7):
+        if exit > enter:
+            raise ValueError("exit band must not exceed enter band")
+        self.profile = profile
+        self.enter = enter
+        self.exit = exit
+        self.min_dwell = min_dwell
+        self.select_dwell = select_dwell
+
+        self.current = None             # None tant qu'aucune direction n'est validée
+        self.since = None               # début de la direction courante
+        self._candidate = None
+        self._candidate_since = None
+        self._dwell_sent = False
+
+    def reset(self):
+        self.current = None
+        self.since = None
+        self._candidate = None
+        self._candidate_since = None
+        self._dwell_sent = False
+
+    def _classify(self, pos):
+        direction, distance = self.profile.score(pos)
+        if distance >= self.enter:
+            return direction
+        # Direction courante conservée tant qu'on reste au-dessus de la bande de sortie
+        if self.current not in (None, "center") and self.profile.distance(pos, self.current) >= self.exit:
+            return self.current
+        return "center"
+
+    def update(self, pos, t):
+        """Retourne la liste (souvent vide) des événements de cette frame"""
+        if self.profile.center is None:
+            return []
+        observed = self._classify(pos)
+
+        if observed == self.current:
+            self._candidate = None
+            if not self._dwell_sent and t - self.since >= self.select_dwell:
+                self._dwell_sent = True
+                return [DirectionEvent(DWELL, self.current, self.current, t, t - self.since)]
+            return []
+
+        # Anti-rebond : la nouvelle direction doit tenir min_dwell secondes
+        if observed != self._candidate:
+            self._candidate = observed
+            self._candidate_since = t
+        if t - self._candidate_since < self.min_dwell and self.current is not None:
+            return []
+
+        previous = self.current
+        held = self._candidate_since - self.since if self.since is not None else 0.0
+        self.current = observed
+        self.since = self._candidate_since
+        self._candidate = None
+        self._dwell_sent = False
+        return [DirectionEvent(CHANGE, observed, previous, t, held)]
+
+    @property
+    def pending(self) -> bool:
+        """Une nouvelle direction est en cours d'anti-rebond (transition pas encore validée)"""
+        return self._candidate is not None
+
+    def held_for(self, t):
+        """Temps passé dans la direction courante"""
+        return 0.0 if self.since is None else t - self.since
@@ -0,0 +1,266 @@
+# eye_tracking/eye_module.py
+# ==========================
+
+import mediapipe as mp
+import threading
+import time
+import os
+
+from shared.protocol import InputMode, UserIntent
+from eye_tracking.blink import DOUBLE, AdaptiveEarThreshold, BlinkDetector
+from eye_tracking.calibration import CalibrationProfile, CalibrationStore
+from eye_tracking.direction import DirectionTracker
+from eye_tracking.filters import create_filter
+from eye_tracking.landmarks import LandmarkFrame
+from eye_tracking.pipeline import EyePipeline
+
+# ============================================================
+# VARIABLE PARTAGÉE AVEC main.py
+# ============================================================
+
+_last_eye_command = None
+_lock = threading.Lock()
+_intent_bus = None
+
+
+def get_eye_command():
+    global _last_eye_command
+    with _lock:
+        cmd = _last_eye_command
+        _last_eye_command = None
+    return cmd
+
+
+def _set_eye_command(command: str, t=None, session="default"):
+    """t : instant de capture (time.monotonic) de l'image qui a déclenché la commande"""
+    global _last_eye_command
+    with _lock:
+        _last_eye_command = command
+
+    # Publication immédiate sur le bus (pas d'attente du prochain poll)
+    if _intent_bus is not None:
+        _intent_bus.publish(UserIntent(
+            mode=InputMode.EYE,
+            content=command,
+            confidence=1.0,
+            monotonic=time.monotonic() if t is None else t,
+            source="eye",
+            session=session
+        ))
+# ============================================================
+# MEDIAPIPE CONFIGURATION
+# ============================================================
+
+mp_face_mesh = mp.solutions.face_mesh
+
+def create_face_mesh():
+    """Instance FaceMesh (état de suivi propre) : une par flux vidéo"""
+    return mp_face_mesh.FaceMesh(
+        static_image_mode=False,
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7,
+    )
+
+# ============================================================
+# CALIBRATION (PROFILS PAR PATIENT, PARTAGÉS AVEC smartvision_comunica2)
+# ============================================================
+
+# Directions du profil (anglais) → libellés du module
+DIRECTION_LABELS = {"center": "centre", "up": "haut", "down": "bas", "left": "gauche", "right": "droite"}
+LABEL_DIRECTIONS = {v: k for k, v in DIRECTION_LABELS.items()}
+
+# ============================================================
+# EYE + BLINK DETECTOR (STABILISÉ)
+# ============================================================
+
+class ImprovedEyeDetector:
+    def __init__(self, calibration: CalibrationProfile = None):
+        self.calibration = calibration or CalibrationProfile("default")
+        # Lissage du regard à faible retard, paramétré par patient
+        self.gaze_filter = create_filter(**self.calibration.gaze_filter)
+        # Direction avec hystérésis : événements aux transitions seulement
+        self.directions = DirectionTracker(self.calibration)
+        self.direction_events = []
+
+        # Clignements : règles en durée sur les horodatages de capture,
+        # seuil EAR appris par patient (0.22 fixe tant qu'il est inconnu)
+        self.blinks = BlinkDetector(AdaptiveEarThreshold(initial_open=self.calibration.ear_open))
+        self.blink_events = []
+
+        # Période réfractaire après une commande (remplace time.sleep(0.8))
+        self.refractory_period = 0.8
+        self.last_command_time = float("-inf")
+
+        self.last_direction = None
+        self.last_blink = False
+
+    def detect_blink(self, frame: LandmarkFrame, t=None):
+        """True sur un double clignement (confirmation) ; tous les événements dans blink_events"""
+        # EAR des deux yeux en une seule opération vectorisée
+        ear_l, ear_r = frame.ear()
+        ear = float(ear_l + ear_r) / 2.0
+        # Horodatage de capture : indépendant du temps de traitement
+        t = time.monotonic() if t is None else t
+
+        self.blink_events = self.blinks.update(ear, t)
+        if self.blink_events:
+            # Niveau œil ouvert appris, sauvegardé avec le profil du patient
+            self.calibration.ear_open = self.blinks.threshold.open_level
+            self.calibration.dirty = True
+        return any(e.kind == DOUBLE for e in self.blink_events)
+
+    def get_gaze(self, frame: LandmarkFrame, t=None):
+        t = time.monotonic() if t is None else t
+        return self.gaze_filter(frame.iris_center(), t)
+
+    def get_direction(self, pos, t=None):
+        calibration = self.calibration
+        if calibration.center is None:
+            # Patient jamais calibré : centre provisoire, affiné en ligne ensuite
+            print(f"[EYE] No calibration for '{calibration.patient_id}', using current gaze as center")
+            calibration.set_center(pos)
+            return None
+
+        t = time.monotonic() if t is None else t
+        self.direction_events = self.directions.update(pos, t)
+        direction = self.directions.current
+        if direction == "center" and not self.directions.pending:
+            # Le centre suit lentement la dérive de la tête (pas pendant
+            # l'anti-rebond d'une transition : le regard part déjà ailleurs)
+            calibration.update(pos, direction, t)
+        return DIRECTION_LABELS.get(direction)
+
+    def command_for(self, direction, blink, t):
+        """Commande à émettre pour cette frame, ou None (période réfractaire)"""
+        if not blink or direction is None:
+            return None
+        if t - self.last_command_time < self.refractory_period:
+            return None
+        command = COMMANDS.get(direction)
+        if command is not None:
+            self.last_command_time = t
+        return command
+
+    def process(self, frame: LandmarkFrame, t):
+        """Regard + clignement pour une frame ; retourne la commande ou None"""
+        gaze = self.get_gaze(frame, t)
+        self.last_direction = self.get_direction(gaze, t)
+        self.last_blink = self.detect_blink(frame, t)
+        command = self.command_for(self.last_direction, self.last_blink, t)
+        if command is not None and self.last_direction != "centre":
+            # Direction confirmée par le patient : affiner son décalage
+            self.calibration.update(gaze, LABEL_DIRECTIONS[self.last_direction])
+        return command
+
+COMMANDS = {
+    "haut": "Consultation demandée",
+    "bas": "Médicaments",
+    "gauche": "Besoin WC",
+    "droite": "Confort",
+    "centre": "Rien",
+}
+
+# Statistiques du pipeline affichées toutes les N secondes (0 : désactivé)
+EYE_STATS_EVERY = float(os.environ.get("EYE_STATS_EVERY", "0"))
+# ============================================================
+# EYE TRACKER (UNE INSTANCE PAR CAMÉRA / PATIENT)
+# ============================================================
+
+class EyeTracker:
+    """
+    Suivi du regard d'une session : sa caméra, son FaceMesh, sa calibration
+    et son détecteur. Aucun état partagé entre deux sessions.
+
+        tracker = EyeTracker("lit-3", src=1, patient_id="p-042", on_command=lambda cmd, t: ...).start()
+    """
+
+    def __init__(self, session_id="default", src=0, on_command=None, patient_id=None, store=None,
+                 width=640, height=480, fps=30, stats_every=EYE_STATS_EVERY):
+        self.session_id = session_id
+        self.patient_id = patient_id or session_id
+        self.src = src
+        self.on_command = on_command
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.stats_every = stats_every
+
+        self.store = store or CalibrationStore()
+        self.calibration = self.store.load(self.patient_id)
+        self.detector = ImprovedEyeDetector(self.calibration)
+        self.pipeline = None
+
+    def _decide(self, frame: LandmarkFrame, t):
+        """Étage de décision : appelé avec les landmarks de l'image la plus récente"""
+        command = self.detector.process(frame, t)
+        if command is not None and self.on_command is not None:
+            self.on_command(command, t)
+
+    def start(self):
+        # FaceMesh créé ici : dans le thread / processus qui fera l'inférence
+        self.pipeline = EyePipeline(create_face_mesh(), self._decide, src=self.src,
+                                    width=self.width, height=self.height, fps=self.fps,
+                                    stats_every=self.stats_every).start()
+        print(f"[EYE] Eye tracking started ({self.session_id}, camera {self.src})")
+        return self
+
+    def is_running(self) -> bool:
+        return self.pipeline is not None and self.pipeline.is_running()
+
+    def run_forever(self, save_every=30.0):
+        # Capture, inférence et décision tournent sur leurs propres threads ;
+        # ici on ne fait que sauvegarder le profil affiné en ligne
+        last_save = time.monotonic()
+        while self.is_running():
+            time.sleep(1.0)
+            if time.monotonic() - last_save >= save_every:
+                self.store.save_if_dirty(self.calibration)
+                last_save = time.monotonic()
+        self.stop()
+
+    def stats(self):
+        """Latence par étage et images abandonnées (None si non démarré)"""
+        return self.pipeline.stats() if self.pipeline is not None else None
+
+    def stop(self):
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        self.store.save_if_dirty(self.calibration)
+
+# ============================================================
+# API MODULE (UNE CAMÉRA) POUR main.py
+# ============================================================
+
+_tracker = None
+
+
+# Patient suivi par la caméra par défaut (profil de calibration)
+PATIENT_ID = os.environ.get("PATIENT_ID", "default")
+
+
+def eye_tracking_loop():
+    global _tracker
+    _tracker = EyeTracker(patient_id=PATIENT_ID,
+                          on_command=lambda command, t: _set_eye_command(command, t, PATIENT_ID)).start()
+    _tracker.run_forever()
+
+
+def get_eye_pipeline_stats():
+    return _tracker.stats() if _tracker is not None else None
+
+
+def get_eye_progress():
+    """Compteurs de progression du pipeline ({} tant qu'il n'a pas démarré)"""
+    if _tracker is None or _tracker.pipeline is None:
+        return {}
+    return _tracker.pipeline.progress()
+
+
+def start_eye_tracking(bus=None):
+    global _intent_bus
+    _intent_bus = bus
+    t = threading.Thread(target=eye_tracking_loop, daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,150 @@
+# eye_tracking/filters.py
+# ========================
+# Filtres de lissage du regard (coordonnées flottantes, horodatées).
+#
+# La moyenne glissante sur 10 échantillons retarde d'environ 150 ms à
+# 30 FPS et tremble encore près des seuils. Le filtre One-Euro lisse
+# fortement à l'arrêt et suit sans retard pendant les saccades ; le
+# Kalman à vitesse constante anticipe le mouvement.
+#
+# Interface commune : f(pos, t) → (x, y), f.reset()
+#
+#   gaze_filter = create_filter("one_euro", min_cutoff=0.5, beta=0.02)
+
+import math
+
+from eye_tracking.landmarks import PositionHistory
+
+
+class MovingAverageFilter:
+    """
+    Ancienne moyenne glissante (boxcar). Gardée : référence de
+    bench_filters, et retour arrière possible par profil patient
+    (gaze_filter = {"name": "moving_average"}).
+    """
+
+    name = "moving_average"
+
+    def __init__(self, size=10, warmup=6):
+        self.size = size
+        self.warmup = warmup
+        self.history = PositionHistory(maxlen=size)
+
+    def reset(self):
+        self.history = PositionHistory(maxlen=self.size)
+
+    def __call__(self, pos, t):
+        self.history.append(pos)
+        if len(self.history) >= self.warmup:
+            x, y = self.history.mean()
+            return float(x), float(y)
+        return float(pos[0]), float(pos[1])
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """
+    Filtre One-Euro (Casiez et al., 2012) en 2D : la fréquence de coupure
+    augmente avec la vitesse (norme du vecteur vitesse filtré, px/s).
+    """
+
+    name = "one_euro"
+
+    def __init__(self, min_cutoff=0.5, beta=0.02, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = (0.0, 0.0)
+        self._t = None
+
+    def __call__(self, pos, t):
+        x, y = float(pos[0]), float(pos[1])
+        if self._x is None or t <= self._t:
+            self._x, self._t = (x, y), t
+            return self._x
+        dt = t - self._t
+        px, py = self._x
+
+        a_d = _alpha(self.d_cutoff, dt)
+        dx = self._dx[0] + a_d * ((x - px) / dt - self._dx[0])
+        dy = self._dx[1] + a_d * ((y - py) / dt - self._dx[1])
+
+        cutoff = self.min_cutoff + self.beta * math.hypot(dx, dy)
+        a = _alpha(cutoff, dt)
+        self._x = (px + a * (x - px), py + a * (y - py))
+        self._dx = (dx, dy)
+        self._t = t
+        return self._x
+
+
+class KalmanFilter:
+    """
+    Kalman à vitesse constante, axes x et y indépendants (état position,
+    vitesse). process_noise : densité d'accélération (px²/s³),
+    measurement_noise : variance de la mesure (px²).
+    """
+
+    name = "kalman"
+
+    def __init__(self, process_noise=2000.0, measurement_noise=4.0):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.reset()
+
+    def reset(self):
+        self._axes = None
+        self._t = None
+
+    def _step(self, state, z, dt):
+        p, v, p00, p01, p11 = state
+        # Prédiction
+        p += v * dt
+        q = self.q
+        p00 += dt * (2 * p01 + dt * p11) + q * dt ** 3 / 3
+        p01 += dt * p11 + q * dt ** 2 / 2
+        p11 += q * dt
+        # Correction
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        err = z - p
+        p += k0 * err
+        v += k1 * err
+        p11 -= k1 * p01
+        p01 -= k0 * p01
+        p00 -= k0 * p00
+        return [p, v, p00, p01, p11]
+
+    def __call__(self, pos, t):
+        x, y = float(pos[0]), float(pos[1])
+        if self._axes is None or t <= self._t:
+            self._axes = [[x, 0.0, self.r, 0.0, 1e4], [y, 0.0, self.r, 0.0, 1e4]]
+            self._t = t
+            return x, y
+        dt = t - self._t
+        self._axes = [self._step(self._axes[0], x, dt), self._step(self._axes[1], y, dt)]
+        self._t = t
+        return self._axes[0][0], self._axes[1][0]
+
+
+FILTERS = {
+    MovingAverageFilter.name: MovingAverageFilter,
+    OneEuroFilter.name: OneEuroFilter,
+    KalmanFilter.name: KalmanFilter,
+}
+
+DEFAULT_FILTER = {"name": OneEuroFilter.name, "min_cutoff": 0.5, "beta": 0.02, "d_cutoff": 1.0}
+
+
+def create_filter(name=None, **params):
+    name = name or DEFAULT_FILTER["name"]
+    if name not in FILTERS:
+        raise ValueError(f"Unknown gaze filter '{name}' (available: {', '.join(FILTERS)})")
+    return FILTERS[name](**params)
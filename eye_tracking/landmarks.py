@@ -0,0 +1,113 @@
+# eye_tracking/landmarks.py
+# ==========================
+# Calcul vectorisé sur les landmarks FaceMesh (EAR, centre des iris)
+
+import numpy as np
+
+NUM_LANDMARKS = 478          # FaceMesh avec refine_landmarks=True
+
+RIGHT_IRIS = 468
+LEFT_IRIS = 473
+LEFT_EYE = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+
+# Paires de points pour l'EAR, par œil : (p1,p5), (p2,p4) verticales, (p0,p3) horizontale
+# Forme (2 yeux, 2 extrémités, 3 segments)
+EAR_PAIRS = np.array([
+    [[eye[1], eye[2], eye[0]], [eye[5], eye[4], eye[3]]]
+    for eye in (LEFT_EYE, RIGHT_EYE)
+], dtype=np.intp)
+
+# Contour du visage : front, menton, joues (boîte englobante du visage)
+FACE_EXTREMES = [10, 152, 234, 454]
+
+# Lignes réellement utilisées par frame. Lire les 478 landmarks via
+# l'accesseur protobuf coûte plus cher que tout le calcul qui suit :
+# on ne copie que ces lignes. Les autres restent à NaN (jamais à jour).
+TRACKED_LANDMARKS = np.array(sorted(set(LEFT_EYE + RIGHT_EYE + [RIGHT_IRIS, LEFT_IRIS] + FACE_EXTREMES)),
+                             dtype=np.intp)
+
+
+class LandmarkFrame:
+    """
+    Landmarks d'une frame dans un tableau float32 (N, 3) préalloué,
+    en pixels (x * w, y * h, z * w).
+
+    Seules les lignes `rows` (TRACKED_LANDMARKS par défaut) sont remplies
+    par fill() ; les autres valent NaN. Avec rows=None, toutes les lignes
+    sont copiées.
+    """
+
+    def __init__(self, n=NUM_LANDMARKS, rows=TRACKED_LANDMARKS):
+        self.points = np.full((n, 3), np.nan, dtype=np.float32)
+        self.rows = rows                                   # None : toutes les lignes
+        # Liste d'entiers Python : plus rapide à parcourir qu'un tableau numpy
+        self._row_list = None if rows is None else [int(i) for i in rows]
+        self._scale = np.ones(3, dtype=np.float32)         # (w, h, w)
+
+    def fill(self, landmarks, w, h, x0=0, y0=0):
+        """
+        Copie les landmarks MediaPipe (une seule passe par frame).
+        (x0, y0) : origine de la zone analysée dans l'image complète
+        quand l'inférence a tourné sur un recadrage de taille (w, h).
+        """
+        points = self.points
+        rows = range(len(landmarks)) if self._row_list is None else self._row_list
+        for i in rows:
+            lm = landmarks[i]
+            p = points[i]
+            p[0] = x0 + lm.x * w
+            p[1] = y0 + lm.y * h
+            p[2] = lm.z * w
+
+    def mirror(self, w):
+        """Miroir horizontal en espace landmarks (x → w - x), au lieu de cv2.flip sur l'image"""
+        x = self.points[:, 0]
+        np.subtract(w, x, out=x)
+
+    def fill_array(self, array, w, h, rows=None):
+        """
+        Copie depuis un tableau normalisé déjà extrait (rejeu, cache) :
+        (N, 3) pour toutes les lignes, ou (len(rows), 3) pour les lignes `rows`.
+        """
+        self._scale[0] = w
+        self._scale[1] = h
+        self._scale[2] = w
+        if rows is None:
+            np.multiply(array, self._scale, out=self.points, casting="same_kind")
+        else:
+            self.points[rows] = array * self._scale
+
+    def ear(self):
+        """EAR gauche et droit, tableau de forme (2,)"""
+        # Vecteur de chaque segment, puis sa longueur : forme (2 yeux, 3 segments)
+        d = self.points[EAR_PAIRS[:, 0]] - self.points[EAR_PAIRS[:, 1]]
+        dist = np.hypot(d[..., 0], d[..., 1])
+        return (dist[:, 0] + dist[:, 1]) / (2.0 * dist[:, 2])
+
+    def iris_center(self):
+        """Centre des deux iris en pixels, tableau de forme (2,)"""
+        return (self.points[RIGHT_IRIS, :2] + self.points[LEFT_IRIS, :2]) * 0.5
+
+
+class PositionHistory:
+    """Historique circulaire préalloué des positions du regard"""
+
+    def __init__(self, maxlen=10):
+        self._buf = np.zeros((maxlen, 2), dtype=np.float32)
+        self._index = 0
+        self.count = 0
+
+    def append(self, pos):
+        self._buf[self._index] = pos
+        self._index = (self._index + 1) % len(self._buf)
+        self.count = min(self.count + 1, len(self._buf))
+
+    def mean(self):
+        if self.count == 0:
+            return np.zeros(2, dtype=np.float32)
+        # sum / count : plus rapide que .mean() sur un si petit tableau
+        return self._buf[:self.count].sum(axis=0) / self.count
+
+    def __len__(self):
+        return self.count
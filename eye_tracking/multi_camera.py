@@ -0,0 +1,121 @@
+# eye_tracking/multi_camera.py
+# =============================
+# Plusieurs lits sur un même poste : un processus par caméra.
+#
+# MediaPipe garde le GIL pendant une bonne partie de l'inférence : des
+# threads dans un seul processus se sérialisent. Chaque caméra a donc son
+# processus (son EyeTracker, son FaceMesh) ; les commandes et les
+# statistiques remontent au coordinateur par une multiprocessing.Queue ;
+# les commandes y voyagent en UserIntent encodé (shared.protocol), avec
+# l'instant de capture de l'image qui les a déclenchées.
+#
+#   coordinator = MultiCameraCoordinator({"lit-1": 0, "lit-2": 1}, bus=bus).start()
+
+import multiprocessing
+import queue
+import threading
+import time
+
+from shared.protocol import InputMode, UserIntent, decode_intent, encode_intent
+
+
+def _camera_worker(session_id, src, out_queue, stop_event, stats_every, save_every):
+    """Processus d'une caméra : EyeTracker local, commandes renvoyées au coordinateur"""
+    from eye_tracking.eye_module import EyeTracker
+
+    def on_command(command, t):
+        intent = UserIntent(mode=InputMode.EYE, content=command, confidence=1.0,
+                            monotonic=t, source="eye", session=session_id)
+        out_queue.put(("intent", session_id, encode_intent(intent), intent.timestamp))
+
+    tracker = EyeTracker(session_id, src, on_command=on_command, stats_every=0).start()
+    last_save = time.monotonic()
+    try:
+        while tracker.is_running() and not stop_event.wait(stats_every):
+            out_queue.put(("stats", session_id, tracker.stats(), time.time()))
+            # Comme EyeTracker.run_forever : profil affiné en ligne sauvegardé
+            # régulièrement, pas seulement à l'arrêt (processus tué, coupure)
+            if time.monotonic() - last_save >= save_every:
+                tracker.store.save_if_dirty(tracker.calibration)
+                last_save = time.monotonic()
+    finally:
+        out_queue.put(("stats", session_id, tracker.stats(), time.time()))
+        tracker.stop()
+        out_queue.put(("stopped", session_id, None, time.time()))
+
+
+class MultiCameraCoordinator:
+    """
+    Démarre un processus par caméra et publie leurs commandes.
+
+    `on_command(session_id, command, timestamp)` remplace la publication
+    par défaut sur le bus (UserIntent EYE).
+    """
+
+    def __init__(self, cameras, bus=None, on_command=None, stats_every=2.0, save_every=30.0):
+        self.cameras = dict(cameras)            # session_id → index caméra ou fichier vidéo
+        self.bus = bus
+        self.on_command = on_command
+        self.stats_every = stats_every
+        self.save_every = save_every
+
+        # spawn : pas de fork d'un processus qui a déjà des threads / MediaPipe
+        ctx = multiprocessing.get_context("spawn")
+        self._queue = ctx.Queue()
+        self._stop_event = ctx.Event()
+        self._processes = {
+            sid: ctx.Process(target=_camera_worker, name=f"eye-{sid}", daemon=True,
+                             args=(sid, src, self._queue, self._stop_event, stats_every, save_every))
+            for sid, src in self.cameras.items()
+        }
+        self._drain_thread = None
+
+        self.stats = {}                         # session_id → dernières stats du pipeline
+        self.commands = {sid: 0 for sid in self.cameras}
+        self.stopped = set()
+
+    def start(self):
+        for p in self._processes.values():
+            p.start()
+        self._drain_thread = threading.Thread(target=self._drain, daemon=True)
+        self._drain_thread.start()
+        return self
+
+    def _drain(self):
+        while len(self.stopped) < len(self._processes):
+            try:
+                kind, sid, payload, ts = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self._processes.values()):
+                    break
+                continue
+            if kind == "intent":
+                self.commands[sid] += 1
+                self._handle_intent(decode_intent(payload))
+            elif kind == "stats":
+                self.stats[sid] = payload
+            elif kind == "stopped":
+                self.stopped.add(sid)
+
+    def _handle_intent(self, intent: UserIntent):
+        if self.on_command is not None:
+            self.on_command(intent.session, intent.content, intent.timestamp)
+            return
+        print(f"[EYE:{intent.session}] {intent.content}")
+        if self.bus is not None:
+            self.bus.publish(intent)
+
+    def is_running(self) -> bool:
+        return any(p.is_alive() for p in self._processes.values())
+
+    def join(self, timeout=None):
+        if self._drain_thread is not None:
+            self._drain_thread.join(timeout)
+
+    def stop(self, timeout=5.0):
+        self._stop_event.set()
+        self.join(timeout)
+        for p in self._processes.values():
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
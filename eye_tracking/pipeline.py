@@ -0,0 +1,179 @@
+# eye_tracking/pipeline.py
+# =========================
+# Pipeline à trois étages pour le suivi du regard :
+#
+#   capture (FrameGrabber) → anneau d'images → inférence FaceMesh
+#                          → anneau de LandmarkFrame → décision (clignement / regard)
+#
+# Chaque étage a son thread : la lecture caméra et l'inférence MediaPipe
+# se recouvrent au lieu de s'additionner. Entre deux étages, le
+# consommateur prend toujours la donnée la plus récente et les
+# données périmées sont comptées comme abandonnées.
+#
+# L'image caméra n'est jamais retournée : l'effet miroir (gauche/droite
+# du patient) est appliqué aux landmarks, pas aux pixels.
+
+import threading
+import time
+from collections import deque
+
+from eye_tracking.capture import FrameGrabber
+from eye_tracking.landmarks import LandmarkFrame
+from eye_tracking.ring import SlotRing
+from eye_tracking.roi import FrameBuffers, RoiTracker, to_rgb
+
+
+class StageStats:
+    """Latences (fenêtre glissante) et compteurs d'un étage"""
+
+    def __init__(self, name, window=300):
+        self.name = name
+        self.count = 0
+        self.dropped = 0
+        self.loops = 0          # tours de boucle, même sans donnée : avance tant que l'étage n'est pas bloqué
+        self._latencies = deque(maxlen=window)
+        self._times = deque(maxlen=window)
+
+    def record(self, latency_s, t=None):
+        self.count += 1
+        self._latencies.append(latency_s)
+        self._times.append(time.monotonic() if t is None else t)
+
+    def snapshot(self):
+        lat = sorted(self._latencies)
+        span = self._times[-1] - self._times[0] if len(self._times) > 1 else 0.0
+        return {
+            "count": self.count,
+            "dropped": self.dropped,
+            "fps": (len(self._times) - 1) / span if span > 0 else 0.0,
+            "p50_ms": lat[len(lat) // 2] * 1000 if lat else 0.0,
+            "p95_ms": lat[int(len(lat) * 0.95)] * 1000 if lat else 0.0,
+        }
+
+
+class EyePipeline:
+    """
+        pipeline = EyePipeline(face_mesh, decide).start()
+        ...
+        print(pipeline.stats())
+
+    `decide(landmark_frame, t)` est appelé sur le thread de décision avec
+    l'horodatage de capture de l'image correspondante.
+    """
+
+    def __init__(self, face_mesh, decide, src=0, width=640, height=480, fps=30,
+                 mirror=True, roi=True, stats_every=0.0):
+        self.face_mesh = face_mesh
+        self.decide = decide
+        self.mirror = mirror
+        self.stats_every = stats_every
+
+        self.grabber = FrameGrabber(src, width, height, fps)
+        # Budget d'inférence : suivre la cadence de la caméra
+        self.roi = RoiTracker(budget_ms=1000.0 / fps) if roi else None
+        self.buffers = FrameBuffers(maxsize=1)
+        self.results = SlotRing([LandmarkFrame() for _ in range(3)])
+        self._running = False
+        self._threads = []
+
+        self.capture_stats = StageStats("capture")      # âge de l'image à la prise en charge
+        self.inference_stats = StageStats("inference")  # conversion + FaceMesh + copie
+        self.decision_stats = StageStats("decision")    # logique clignement / regard
+        self.total_stats = StageStats("end_to_end")     # capture → décision terminée
+
+    def start(self):
+        self.grabber.start()
+        self._running = True
+        for target in (self._inference_loop, self._decision_loop):
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            self._threads.append(t)
+        if self.stats_every > 0:
+            threading.Thread(target=self._report_loop, daemon=True).start()
+        return self
+
+    def is_running(self) -> bool:
+        return self._running and self.grabber.is_opened()
+
+    def _inference_loop(self):
+        frames = self.grabber.ring
+        seq = 0
+        while self._running and not frames.closed:
+            self.inference_stats.loops += 1
+            got = frames.acquire(seq)
+            if got is None:
+                continue
+            slot, seq, t = got
+            start = time.monotonic()
+            self.capture_stats.record(start - t, start)
+            try:
+                frame = frames.buffers[slot]
+                h, w = frame.shape[:2]
+                out = self.results.writable()
+                landmarks = self.results.buffers[out]
+                if self.roi is not None:
+                    found = self.roi.process(self.face_mesh, frame, landmarks)
+                else:
+                    res = self.face_mesh.process(to_rgb(frame, self.buffers))
+                    found = bool(res.multi_face_landmarks)
+                    if found:
+                        landmarks.fill(res.multi_face_landmarks[0].landmark, w, h)
+                if found:
+                    if self.mirror:
+                        landmarks.mirror(w)
+                    self.results.publish(out, t)
+            finally:
+                frames.release(slot)
+            self.inference_stats.record(time.monotonic() - start)
+        self.results.close()
+
+    def _decision_loop(self):
+        seq = 0
+        while self._running and not self.results.closed:
+            self.decision_stats.loops += 1
+            got = self.results.acquire(seq)
+            if got is None:
+                continue
+            slot, seq, t = got
+            start = time.monotonic()
+            try:
+                self.decide(self.results.buffers[slot], t)
+            finally:
+                self.results.release(slot)
+            end = time.monotonic()
+            self.decision_stats.record(end - start, end)
+            self.total_stats.record(end - t, end)
+
+    def stats(self):
+        self.capture_stats.dropped = self.grabber.ring.dropped
+        self.decision_stats.dropped = self.results.dropped
+        stats = {s.name: s.snapshot() for s in
+                 (self.capture_stats, self.inference_stats, self.decision_stats, self.total_stats)}
+        if self.roi is not None:
+            stats["roi"] = self.roi.stats()
+        return stats
+
+    def progress(self):
+        """Compteurs croissants par étage (superviseur : un compteur figé = étage bloqué)"""
+        return {"capture": self.grabber.frames_read,
+                "inference": self.inference_stats.loops,
+                "decision": self.decision_stats.loops}
+
+    def _report_loop(self):
+        while self._running:
+            time.sleep(self.stats_every)
+            for name, s in self.stats().items():
+                if name == "roi":
+                    print(f"[EYE] roi        scale {s['scale']}  roi/full runs {s['roi_runs']}/{s['full_runs']}  "
+                          f"lost {s['lost']}")
+                    continue
+                print(f"[EYE] {name:<10} {s['fps']:5.1f} fps  p50 {s['p50_ms']:6.1f} ms  "
+                      f"p95 {s['p95_ms']:6.1f} ms  dropped {s['dropped']}")
+
+    def stop(self):
+        self._running = False
+        self.grabber.stop()
+        self.grabber.ring.close()
+        self.results.close()
+        for t in self._threads:
+            t.join(timeout=1.0)
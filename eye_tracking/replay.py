@@ -0,0 +1,249 @@
+# eye_tracking/replay.py
+# =======================
+# Rejeu hors ligne du suivi du regard, sans webcam et plus vite que le
+# temps réel : même détecteur (ImprovedEyeDetector) que le module live.
+#
+# Sources :
+#   - fichier vidéo (.mp4, .avi, ...)
+#   - dossier d'images (triées par nom, cadence --fps)
+#   - landmarks en cache : .npz écrit par --cache (seules les lignes
+#     TRACKED_LANDMARKS, (F, K, 3) + indices `rows`), ou .npy (F, 478, 3)
+#     normalisé ; lignes NaN quand aucun visage
+#
+# Usage :
+#   python -m eye_tracking.replay session.mp4 --cache session.npz --out session.jsonl
+#   python -m eye_tracking.replay session.npz --blink-threshold 0.2
+#
+# Le cache ne contient que des landmarks : on peut rejouer des heures
+# d'enregistrement en quelques secondes pour régler les seuils.
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from eye_tracking.landmarks import TRACKED_LANDMARKS, LandmarkFrame
+from eye_tracking.roi import FrameBuffers, RoiTracker, to_rgb
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class VideoSource:
+    """Images d'un fichier vidéo, horodatées par la position dans le flux"""
+
+    kind = "frames"
+
+    def __init__(self, path):
+        self.path = path
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise ValueError(f"cannot open video '{path}'")
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+
+    def __iter__(self):
+        cap = cv2.VideoCapture(self.path)
+        i = 0
+        frame = None
+        while True:
+            ok, frame = cap.read(frame)        # tampon réutilisé
+            if not ok:
+                break
+            yield i / self.fps, frame
+            i += 1
+        cap.release()
+
+
+class ImageDirSource:
+    """Images d'un dossier, triées par nom, à cadence fixe"""
+
+    kind = "frames"
+
+    def __init__(self, path, fps=30.0):
+        self.files = sorted(os.path.join(path, f) for f in os.listdir(path)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.files:
+            raise ValueError(f"no images in '{path}'")
+        self.fps = fps
+        self.height, self.width = cv2.imread(self.files[0]).shape[:2]
+
+    def __iter__(self):
+        for i, path in enumerate(self.files):
+            yield i / self.fps, cv2.imread(path)
+
+
+class LandmarkSource:
+    """Landmarks normalisés déjà extraits : aucune inférence au rejeu"""
+
+    kind = "landmarks"
+
+    def __init__(self, path, fps=30.0, width=640, height=480):
+        if path.endswith(".npz"):
+            data = np.load(path)
+            self.landmarks = data["landmarks"]
+            self.found = data["found"]
+            self.timestamps = data["t"]
+            self.width, self.height = (int(v) for v in data["size"])
+            # Anciens caches sans `rows` : les 478 lignes
+            self.rows = data["rows"] if "rows" in data else None
+        else:
+            self.landmarks = np.load(path, mmap_mode="r")
+            self.found = ~np.isnan(self.landmarks[:, 0, 0])
+            self.timestamps = np.arange(len(self.landmarks)) / fps
+            self.width, self.height = width, height
+            self.rows = None
+        self.fps = fps
+
+    def __iter__(self):
+        for t, found, lms in zip(self.timestamps, self.found, self.landmarks):
+            yield float(t), (lms if found else None)
+
+
+def open_source(path, fps=30.0):
+    if os.path.isdir(path):
+        return ImageDirSource(path, fps)
+    if path.endswith((".npz", ".npy")):
+        return LandmarkSource(path, fps)
+    return VideoSource(path)
+
+
+class LandmarkRecorder:
+    """
+    Accumule les landmarks normalisés (image complète, avant miroir) pour --cache.
+    Seules les lignes TRACKED_LANDMARKS sont à jour dans LandmarkFrame : ce
+    sont les seules enregistrées.
+    """
+
+    def __init__(self, width, height):
+        self.size = (width, height)
+        self._scale = np.array([width, height, width], dtype=np.float32)
+        self.landmarks = []
+        self.found = []
+        self.timestamps = []
+
+    def add(self, t, frame: LandmarkFrame = None):
+        self.timestamps.append(t)
+        self.found.append(frame is not None)
+        if frame is None:
+            self.landmarks.append(np.full((len(TRACKED_LANDMARKS), 3), np.nan, dtype=np.float32))
+        else:
+            self.landmarks.append(frame.points[TRACKED_LANDMARKS] / self._scale)
+
+    def save(self, path):
+        np.savez_compressed(path, landmarks=np.stack(self.landmarks), found=np.array(self.found),
+                            t=np.array(self.timestamps), size=np.array(self.size),
+                            rows=TRACKED_LANDMARKS)
+
+
+def replay(source, detector, face_mesh=None, roi=True, mirror=True, recorder=None):
+    """
+    Traite la source aussi vite que possible ; produit un dict par frame :
+    frame, t, found, infer_ms, decide_ms, direction, blink, command.
+    """
+    landmarks = LandmarkFrame()
+    tracker = RoiTracker() if roi else None
+    buffers = FrameBuffers(maxsize=1)
+    w, h = source.width, source.height
+
+    for i, (t, item) in enumerate(source):
+        start = time.perf_counter()
+        if source.kind == "landmarks":
+            found = item is not None
+            if found:
+                landmarks.fill_array(item, w, h, source.rows)
+        else:
+            h, w = item.shape[:2]
+            if tracker is not None:
+                found = tracker.process(face_mesh, item, landmarks)
+            else:
+                res = face_mesh.process(to_rgb(item, buffers))
+                found = bool(res.multi_face_landmarks)
+                if found:
+                    landmarks.fill(res.multi_face_landmarks[0].landmark, w, h)
+            if recorder is not None:
+                recorder.add(t, landmarks if found else None)
+        inferred = time.perf_counter()
+
+        command = None
+        if found:
+            if mirror:
+                landmarks.mirror(w)
+            command = detector.process(landmarks, t)
+        done = time.perf_counter()
+
+        yield {
+            "frame": i,
+            "t": round(t, 4),
+            "found": found,
+            "infer_ms": round((inferred - start) * 1000, 3),
+            "decide_ms": round((done - inferred) * 1000, 3),
+            "direction": detector.last_direction if found else None,
+            "blink": bool(detector.last_blink) if found else False,
+            "blink_events": [e.kind for e in detector.blink_events] if found else [],
+            "command": command,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", help="video file, image directory, or .npz/.npy landmark cache")
+    parser.add_argument("--fps", type=float, default=30.0, help="frame rate for image dirs and .npy")
+    parser.add_argument("--cache", help="write extracted landmarks to this .npz")
+    parser.add_argument("--out", help="per-frame JSON lines (default: commands only on stdout)")
+    parser.add_argument("--no-roi", action="store_true")
+    parser.add_argument("--no-mirror", action="store_true")
+    parser.add_argument("--blink-threshold", type=float, help="fixed EAR threshold (disables adaptation)")
+    parser.add_argument("--refractory", type=float)
+    parser.add_argument("--patient", help="start from this patient's calibration profile (not saved back)")
+    args = parser.parse_args()
+
+    from eye_tracking.blink import AdaptiveEarThreshold
+    from eye_tracking.calibration import CalibrationProfile, CalibrationStore
+    from eye_tracking.eye_module import ImprovedEyeDetector, create_face_mesh
+
+    source = open_source(args.source, args.fps)
+    profile = CalibrationStore().load(args.patient) if args.patient else CalibrationProfile("replay")
+    detector = ImprovedEyeDetector(calibration=profile)
+    if args.blink_threshold is not None:
+        detector.blinks.threshold = AdaptiveEarThreshold(fallback=args.blink_threshold, warmup=float("inf"))
+    if args.refractory is not None:
+        detector.refractory_period = args.refractory
+
+    face_mesh = create_face_mesh() if source.kind == "frames" else None
+    recorder = LandmarkRecorder(source.width, source.height) if args.cache and source.kind == "frames" else None
+    out = open(args.out, "w") if args.out else None
+
+    frames = found = 0
+    commands = []
+    start = time.perf_counter()
+    for record in replay(source, detector, face_mesh, roi=not args.no_roi,
+                         mirror=not args.no_mirror, recorder=recorder):
+        frames += 1
+        found += record["found"]
+        if out is not None:
+            out.write(json.dumps(record) + "\n")
+        if record["command"]:
+            commands.append(record["command"])
+            print(f"[REPLAY] t={record['t']:8.2f}s  {record['command']}")
+    elapsed = time.perf_counter() - start
+
+    if out is not None:
+        out.close()
+    if recorder is not None:
+        recorder.save(args.cache)
+        print(f"[REPLAY] landmarks cached to {args.cache}")
+
+    media = frames / source.fps if source.fps else 0.0
+    print(f"[REPLAY] {frames} frames ({media:.1f}s of media) in {elapsed:.2f}s "
+          f"({frames / elapsed if elapsed else 0:.0f} fps, x{media / elapsed if elapsed else 0:.1f} real time), "
+          f"face found {found}/{frames}, {len(commands)} commands", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
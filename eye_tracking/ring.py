@@ -0,0 +1,92 @@
+# eye_tracking/ring.py
+# =====================
+# Anneau de tampons préalloués « dernière valeur gagne » entre deux threads.
+#
+# Le producteur écrit dans un emplacement libre puis le publie ; le
+# consommateur prend toujours le plus récent. Un emplacement lu n'est
+# jamais réécrit avant d'être rendu : avec un seul consommateur, trois
+# emplacements suffisent (en cours d'écriture, dernier publié, en lecture).
+
+import threading
+
+
+class SlotRing:
+    """
+        ring = SlotRing([np.empty((480, 640, 3), np.uint8) for _ in range(3)])
+
+        # producteur
+        slot = ring.writable()
+        fill(ring.buffers[slot])
+        ring.publish(slot, time.monotonic())
+
+        # consommateur
+        got = ring.acquire(last_seq)
+        if got is not None:
+            slot, seq, t = got
+            use(ring.buffers[slot])
+            ring.release(slot)
+    """
+
+    def __init__(self, buffers):
+        if len(buffers) < 3:
+            raise ValueError("SlotRing needs at least 3 buffers")
+        self.buffers = list(buffers)
+        self._cond = threading.Condition()
+        self._latest = -1
+        self._seq = 0
+        self._seqs = [0] * len(self.buffers)
+        self._timestamps = [0.0] * len(self.buffers)
+        self._in_use = set()
+        self._last_read_seq = 0
+        self._closed = False
+
+        self.published = 0
+        self.dropped = 0        # publiés puis remplacés sans avoir été lus
+
+    def writable(self) -> int:
+        """Emplacement où écrire : ni le dernier publié, ni un emplacement en lecture"""
+        n = len(self.buffers)
+        with self._cond:
+            for i in range(1, n + 1):
+                slot = (self._latest + i) % n
+                if slot != self._latest and slot not in self._in_use:
+                    return slot
+        raise RuntimeError("no free slot (a consumer did not release its buffer)")
+
+    def publish(self, slot, timestamp):
+        with self._cond:
+            if self._seq > self._last_read_seq:
+                self.dropped += 1
+            self._seq += 1
+            self._latest = slot
+            self._seqs[slot] = self._seq
+            self._timestamps[slot] = timestamp
+            self.published += 1
+            self._cond.notify_all()
+
+    def acquire(self, last_seq=0, timeout=1.0):
+        """
+        Bloque jusqu'à une publication plus récente que `last_seq`.
+        Retourne (slot, seq, timestamp), ou None au timeout / à la fermeture.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > last_seq or self._closed, timeout)
+            if self._seq <= last_seq:
+                return None
+            slot = self._latest
+            self._in_use.add(slot)
+            self._last_read_seq = self._seq
+            return slot, self._seqs[slot], self._timestamps[slot]
+
+    def release(self, slot):
+        with self._cond:
+            self._in_use.discard(slot)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
@@ -0,0 +1,203 @@
+# eye_tracking/roi.py
+# ====================
+# Inférence FaceMesh sur une région d'intérêt autour du dernier visage.
+#
+# Un seul visage est suivi et seuls les yeux / iris sont utilisés : tant
+# que le visage est trouvé, on ne convertit et n'envoie à MediaPipe que
+# le recadrage (avec marge) autour de la boîte englobante précédente.
+# La résolution de traitement s'adapte au temps mesuré.
+#
+# Le FaceMesh de suivi (static_image_mode=False) suppose des images
+# continues : il ne voit que des recadrages, et le recadrage ne bouge que
+# quand le visage s'approche de son bord. Si le visage est perdu, la
+# ré-détection sur l'image complète passe par un second FaceMesh en mode
+# image fixe, pour ne pas corrompre l'état de suivi du premier.
+#
+# Aucune copie d'image par frame : le recadrage est une vue, la réduction
+# et la conversion BGR→RGB écrivent dans des tampons préalloués (dst=),
+# marqués en lecture seule pour que MediaPipe les lise sans les copier.
+
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from eye_tracking.landmarks import FACE_EXTREMES, LandmarkFrame
+
+SCALES = (1.0, 0.75, 0.5)
+BOX_STEP = 32       # taille du recadrage arrondie : peu de formes de tampons distinctes
+
+
+def create_detector():
+    """FaceMesh en mode image fixe : détection sur l'image complète, sans état de suivi"""
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=True,
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.7,
+    )
+
+
+class FrameBuffers:
+    """Tampons uint8 préalloués, un par (usage, forme), les moins récents évincés"""
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self._buffers = OrderedDict()
+        self.allocations = 0
+
+    def get(self, name, shape):
+        key = (name, shape)
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._buffers[key] = buf
+            self.allocations += 1
+            if len(self._buffers) > self.maxsize:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(key)
+        buf.flags.writeable = True
+        return buf
+
+
+def to_rgb(bgr, buffers: FrameBuffers):
+    """BGR → RGB dans un tampon préalloué, rendu en lecture seule pour MediaPipe"""
+    rgb = buffers.get("rgb", bgr.shape)
+    cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=rgb)
+    rgb.flags.writeable = False
+    return rgb
+
+
+class AdaptiveScale:
+    """
+    Facteur de réduction de l'image envoyée à FaceMesh, choisi parmi `levels`
+    selon la moyenne glissante du temps d'inférence par rapport au budget.
+    """
+
+    def __init__(self, budget_ms, levels=SCALES, alpha=0.1, headroom=0.6, patience=15):
+        self.budget_ms = budget_ms
+        self.levels = levels
+        self.alpha = alpha
+        self.headroom = headroom        # remonter en résolution sous budget * headroom
+        self.patience = patience        # frames minimum entre deux changements
+        self.level = 0
+        self.avg_ms = None
+        self._since_change = 0
+
+    @property
+    def scale(self):
+        return self.levels[self.level]
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        self.avg_ms = ms if self.avg_ms is None else self.avg_ms + self.alpha * (ms - self.avg_ms)
+        self._since_change += 1
+        if self._since_change < self.patience:
+            return
+
+        if self.avg_ms > self.budget_ms and self.level < len(self.levels) - 1:
+            self.level += 1
+        elif self.avg_ms < self.budget_ms * self.headroom and self.level > 0:
+            self.level -= 1
+        else:
+            return
+        self._since_change = 0
+        self.avg_ms = None
+
+
+class RoiTracker:
+    """
+        roi = RoiTracker(budget_ms=33)
+        found = roi.process(face_mesh, bgr, landmark_frame)   # landmarks en pixels de `bgr`
+
+    `face_mesh` (suivi) ne reçoit que les recadrages ; `detector` (mode
+    image fixe) fait les détections sur l'image complète. Par défaut il
+    est créé au premier besoin, dans le thread qui fait l'inférence.
+    """
+
+    def __init__(self, margin=0.3, budget_ms=33.0, levels=SCALES, min_side=128, detector=None):
+        self.detector = detector
+        self.margin = margin
+        self.min_side = min_side            # pas de réduction sous cette taille (pixels)
+        self.scaler = AdaptiveScale(budget_ms, levels)
+        self.box = None                     # (x0, y0, x1, y1) en pixels, None : image complète
+        self.buffers = FrameBuffers()
+
+        self.roi_runs = 0
+        self.full_runs = 0
+        self.lost = 0
+        self.moves = 0                      # changements de recadrage (discontinuités pour le suivi)
+
+    def _update_box(self, frame: LandmarkFrame, w, h):
+        pts = frame.points[FACE_EXTREMES, :2]
+        x0, y0 = pts.min(axis=0)
+        x1, y1 = pts.max(axis=0)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            self.box = None
+            return
+        # Taille arrondie au multiple de BOX_STEP supérieur, centrée sur le visage
+        bw = min(w, int(np.ceil((x1 - x0) * (1 + 2 * self.margin) / BOX_STEP)) * BOX_STEP)
+        bh = min(h, int(np.ceil((y1 - y0) * (1 + 2 * self.margin) / BOX_STEP)) * BOX_STEP)
+
+        if self.box is not None:
+            # Visage encore bien à l'intérieur (au moins une demi-marge de
+            # chaque côté) et taille proche : on garde le même recadrage
+            bx0, by0, bx1, by1 = self.box
+            mx, my = (x1 - x0) * self.margin / 2, (y1 - y0) * self.margin / 2
+            if (bw <= bx1 - bx0 <= bw + 2 * BOX_STEP and bh <= by1 - by0 <= bh + 2 * BOX_STEP
+                    and x0 - bx0 >= mx and bx1 - x1 >= mx and y0 - by0 >= my and by1 - y1 >= my):
+                return
+
+        bx = min(max(0, int((x0 + x1 - bw) / 2)), w - bw)
+        by = min(max(0, int((y0 + y1 - bh) / 2)), h - bh)
+        box = (bx, by, bx + bw, by + bh)
+        if box != self.box:
+            self.box = box
+            self.moves += 1
+
+    def _run(self, face_mesh, bgr, out, box):
+        x0, y0, x1, y1 = box
+        crop = bgr[y0:y1, x0:x1]            # vue, pas de copie
+        ch, cw = crop.shape[:2]
+        scale = max(self.scaler.scale, min(1.0, self.min_side / min(ch, cw)))
+        if scale < 1.0:
+            small = self.buffers.get("small", (int(ch * scale), int(cw * scale), 3))
+            cv2.resize(crop, (small.shape[1], small.shape[0]), dst=small, interpolation=cv2.INTER_AREA)
+            crop = small
+        res = face_mesh.process(to_rgb(crop, self.buffers))
+        if not res.multi_face_landmarks:
+            return False
+        # Landmarks normalisés sur le recadrage : indépendants de la réduction
+        out.fill(res.multi_face_landmarks[0].landmark, x1 - x0, y1 - y0, x0, y0)
+        return True
+
+    def process(self, face_mesh, bgr, out: LandmarkFrame) -> bool:
+        start = time.perf_counter()
+        h, w = bgr.shape[:2]
+
+        found = False
+        if self.box is not None:
+            self.roi_runs += 1
+            found = self._run(face_mesh, bgr, out, self.box)
+            if not found:
+                self.lost += 1
+        if not found:
+            # Suivi perdu (ou premier passage) : détection sur l'image complète,
+            # par le FaceMesh image fixe (celui de suivi ne voit que des recadrages)
+            if self.detector is None:
+                self.detector = create_detector()
+            self.full_runs += 1
+            self.box = None
+            found = self._run(self.detector, bgr, out, (0, 0, w, h))
+
+        if found:
+            self._update_box(out, w, h)
+        self.scaler.record(time.perf_counter() - start)
+        return found
+
+    def stats(self):
+        return {"roi_runs": self.roi_runs, "full_runs": self.full_runs, "lost": self.lost,
+                "moves": self.moves, "scale": self.scaler.scale, "avg_ms": self.scaler.avg_ms}
@@ -0,0 +1,301 @@
+"""
+SmartVision Care
+================
+Eye-Based Medical Communication System
+Locked-In Syndrome – Clinical Version
+
+Interaction:
+- Gaze = pre-selection (yellow)
+- Double blink = confirmation (green)
+- "c" key (caregiver) = calibration: center, up, down, left, right
+"""
+
+import tkinter as tk
+from tkinter import messagebox, scrolledtext
+import mediapipe as mp
+import queue
+import time
+import pygame
+import os
+import sys
+
+# Script lancé directement : rendre importables les modules partagés eye_tracking.*
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from eye_tracking.blink import DOUBLE, AdaptiveEarThreshold, BlinkDetector
+from eye_tracking.calibration import CalibrationProfile, CalibrationStore
+from eye_tracking.direction import CHANGE, DWELL, DirectionTracker
+from eye_tracking.filters import create_filter
+from eye_tracking.pipeline import EyePipeline
+
+PATIENT_ID = os.environ.get("PATIENT_ID", "default")
+
+# ============================================================
+# AUDIO INITIALIZATION
+# ============================================================
+
+pygame.mixer.init()
+
+sounds = {}
+try:
+    sounds = {
+        "meal": pygame.mixer.Sound("meal.mp3"),
+        "drink": pygame.mixer.Sound("drink.mp3"),
+        "toilet": pygame.mixer.Sound("toilet.mp3"),
+        "comfort": pygame.mixer.Sound("comfort.mp3"),
+        "nothing": pygame.mixer.Sound("nothing.mp3"),
+    }
+except Exception as e:
+    print("[WARNING] Audio files missing:", e)
+
+print("=" * 70)
+print("SMARTVISION CARE – Eye-Based Medical Communication System")
+print("=" * 70)
+
+# ============================================================
+# MEDIAPIPE CONFIGURATION
+# ============================================================
+
+mp_face_mesh = mp.solutions.face_mesh
+
+face_mesh = mp_face_mesh.FaceMesh(
+    static_image_mode=False,
+    max_num_faces=1,
+    refine_landmarks=True,
+    min_detection_confidence=0.7,
+    min_tracking_confidence=0.7,
+)
+
+# ============================================================
+# CALIBRATION SYSTEM
+# ============================================================
+
+class CalibrationSystem:
+    """
+    Collecte interactive des 5 séries d'échantillons ; le profil du patient
+    (seuils par direction, affinage en ligne) vient du CalibrationStore
+    partagé avec eye_module.
+    """
+
+    ORDER = ["center", "up", "down", "left", "right"]
+
+    def __init__(self, patient_id=PATIENT_ID, store=None):
+        self.store = store or CalibrationStore()
+        self.samples = {"center": [], "up": [], "down": [], "left": [], "right": []}
+        self.current = None
+        self.active = False
+        self.profile = self.store.load(patient_id)
+
+    @property
+    def center(self):
+        return self.profile.center
+
+    def start(self, direction):
+        self.current = direction
+        self.samples[direction] = []
+        self.active = True
+
+    def add(self, pos):
+        self.samples[self.current].append(pos)
+        return len(self.samples[self.current]) >= 30
+
+    def next_direction(self):
+        """Série suivante de la séquence, None après la dernière"""
+        i = self.ORDER.index(self.current) + 1 if self.current in self.ORDER else 0
+        return self.ORDER[i] if i < len(self.ORDER) else None
+
+    def finish(self):
+        if self.samples["center"]:
+            # Seuils dérivés de toutes les séries déjà collectées
+            self.profile = CalibrationProfile.from_samples(self.profile.patient_id, self.samples)
+            self.store.save(self.profile)
+        self.active = False
+        self.current = None
+
+calibration = CalibrationSystem()
+
+# ============================================================
+# EYE DETECTOR
+# ============================================================
+
+class EyeDetector:
+    def __init__(self):
+        self.filter = create_filter(**calibration.profile.gaze_filter)
+        self.reset_directions()
+        self.blinks = BlinkDetector(AdaptiveEarThreshold(initial_open=calibration.profile.ear_open))
+
+    def reset_directions(self):
+        """Après une calibration : seuils du nouveau profil"""
+        self.directions = DirectionTracker(calibration.profile, select_dwell=0.7)
+
+    def get_position(self, frame, t=None):
+        """Regard filtré à partir d'une LandmarkFrame (pixels, déjà en miroir)"""
+        x, y = frame.iris_center()
+        return self.filter((float(x), float(y)), time.monotonic() if t is None else t)
+
+    def get_direction(self, pos, t=None):
+        """Événements de direction (changement / maintien) de cette frame, souvent aucun"""
+        t = time.monotonic() if t is None else t
+        events = self.directions.update(pos, t)
+        if self.directions.current == "center" and not self.directions.pending:
+            # Suivi de la dérive de la tête (pas pendant une transition)
+            calibration.profile.update(pos, "center", t)
+        return events
+
+    def get_blink(self, ear, t):
+        """True sur un double clignement (confirmation)"""
+        events = self.blinks.update(ear, t)
+        if events:
+            # Niveau œil ouvert appris, sauvegardé avec le profil du patient
+            calibration.profile.ear_open = self.blinks.threshold.open_level
+            calibration.profile.dirty = True
+        return any(e.kind == DOUBLE for e in events)
+
+eye = EyeDetector()
+
+# ============================================================
+# GUI SCREEN MANAGER
+# ============================================================
+
+class ScreenManager:
+    def __init__(self, root, buttons, log, status):
+        self.root = root
+        self.buttons = buttons
+        self.log = log
+        self.status = status
+        self.mapping = {}
+        self.selected = None
+        self.dwelled = False
+
+    def set(self, mapping, title):
+        self.mapping = mapping
+        self.status.config(text=title)
+        for d, b in self.buttons.items():
+            if d in mapping:
+                b.config(text=mapping[d][0], state=tk.NORMAL)
+                b.cb = mapping[d][1]
+            else:
+                b.config(text="", state=tk.DISABLED)
+
+    def on_direction(self, event):
+        """Appelé seulement aux transitions du DirectionTracker, pas à chaque frame"""
+        if event.kind == CHANGE:
+            self.highlight(event.direction)
+        elif event.kind == DWELL and event.direction == self.selected:
+            self.dwelled = True
+
+    def highlight(self, d):
+        self.selected = d
+        self.dwelled = False
+        for k, b in self.buttons.items():
+            b.config(bg="gold" if k == d else "#333")
+
+    def validate(self):
+        # Confirmation (double clignement) après un maintien suffisant sur la cible
+        if self.selected in self.mapping and self.dwelled:
+            self.log.insert(tk.END, f"{time.strftime('%H:%M:%S')}  {self.mapping[self.selected][0]}\n")
+            self.log.see(tk.END)
+            self.mapping[self.selected][1]()
+
+# ============================================================
+# EYE TRACKING LOOP
+# ============================================================
+
+# Thread de décision du pipeline → thread Tk (Tkinter n'est pas thread-safe)
+gaze_samples = queue.Queue(maxsize=64)
+
+
+def on_frame(frame, t):
+    """Étage de décision d'EyePipeline : seulement filtrer et transmettre"""
+    pos = eye.get_position(frame, t)
+    ear_l, ear_r = frame.ear()
+    try:
+        gaze_samples.put_nowait((pos, float(ear_l + ear_r) / 2.0, t))
+    except queue.Full:
+        pass    # interface bloquée (boîte de dialogue) : l'échantillon est périmé
+
+
+def process_samples(sm):
+    """Thread Tk : calibration, direction (pré-sélection) et double clignement (confirmation)"""
+    while True:
+        try:
+            pos, ear, t = gaze_samples.get_nowait()
+        except queue.Empty:
+            return
+        if calibration.active:
+            if calibration.add(pos):
+                start_calibration_step(sm, calibration.next_direction())
+            continue
+        for event in eye.get_direction(pos, t):
+            sm.on_direction(event)
+        if eye.get_blink(ear, t):
+            sm.validate()
+
+
+def start_calibration_step(sm, direction):
+    if direction is None:
+        calibration.finish()
+        eye.reset_directions()
+        sm.status.config(text="Calibration saved – Main Menu")
+        return
+    calibration.start(direction)
+    sm.status.config(text=f"Calibration: look {direction}")
+
+# ============================================================
+# GUI
+# ============================================================
+
+def build_gui():
+    root = tk.Tk()
+    root.title("SmartVision Care – Medical Eye-Based Communication")
+    root.geometry("900x650")
+    root.configure(bg="#1e1e1e")
+
+    tk.Label(root, text="SmartVision Care", fg="#00ff88", bg="#1e1e1e",
+             font=("Arial", 20, "bold")).pack(pady=10)
+
+    status = tk.Label(root, text="Main Menu", fg="white", bg="#1e1e1e")
+    status.pack()
+
+    frame = tk.Frame(root, bg="#1e1e1e")
+    frame.pack(expand=True)
+
+    buttons = {}
+    for name, r, c in [("up",0,1),("left",1,0),("center",1,1),("right",1,2),("down",2,1)]:
+        b = tk.Button(frame, width=18, height=2, bg="#333", fg="white")
+        b.grid(row=r, column=c, padx=10, pady=10)
+        buttons[name] = b
+
+    log = scrolledtext.ScrolledText(root, height=8)
+    log.pack(fill=tk.X, padx=10)
+
+    sm = ScreenManager(root, buttons, log, status)
+
+    def play(k):
+        if k in sounds: sounds[k].play()
+
+    sm.set({
+        "up": ("Medical Consultation", lambda: messagebox.showinfo("Consultation","Consultation requested")),
+        "down": ("Medications", lambda: messagebox.showinfo("Medications","Medication info")),
+        "left": ("Basic Needs", lambda: play("meal")),
+        "right": ("Comfort", lambda: play("comfort")),
+        "center": ("No Action", lambda: play("nothing")),
+    }, "Main Menu")
+
+    pipeline = EyePipeline(face_mesh, on_frame).start()
+
+    def poll():
+        process_samples(sm)
+        root.after(15, poll)
+
+    def close():
+        pipeline.stop()
+        calibration.store.save_if_dirty(calibration.profile)
+        root.destroy()
+
+    root.bind("c", lambda _: start_calibration_step(sm, calibration.ORDER[0]))
+    root.protocol("WM_DELETE_WINDOW", close)
+    poll()
+    root.mainloop()
+
+if __name__ == "__main__":
+    build_gui()
@@ -1,15 +1,14 @@
 # main.py
 # =======
 # Point d'entrée global du système multimodal SmartVision
+#
+#   python main.py               modules dans ce processus (threads)
+#   python main.py --processes   un processus supervisé par module (shared/supervisor.py)
+
+import argparse
 
 from mode_manager.mode_manager import ModeManager
-from shared.protocol import InputMode
-from eye_tracking.eye_module import start_eye_tracking, get_eye_command
-from voice_transcription.voice_module import (
-    start_voice_recognition,
-    is_voice_active,
-    get_voice_text
-)
+from shared.intent_bus import IntentBus
 
 
 # --------------------------------------------------
@@ -18,13 +17,10 @@ from voice_transcription.voice_module import (
 
 
 
-def is_gesture_active():
-    # À remplacer par le module gesture
-    return False
-
-
-def get_gesture_command():
-    return ""
+def start_gesture_recognition(bus):
+    # À remplacer par le module gesture :
+    # publiera des UserIntent(mode=InputMode.GESTURE, ...) sur le bus
+    pass
 
 
 def avatar_react(intent):
@@ -36,59 +32,45 @@ def avatar_react(intent):
 # BOUCLE PRINCIPALE
 # --------------------------------------------------
 
-def main_loop():
+def main_loop(processes=False, stats_every=10.0):
     manager = ModeManager()
-
-    # Démarrage du module eye-tracking (thread interne)
-    start_eye_tracking()
-    start_voice_recognition()
+    bus = IntentBus()
+
+    if processes:
+        # Un processus par modalité : plus de GIL partagé, une panne
+        # n'emporte que son module, qui est relancé
+        from shared.supervisor import ModuleSupervisor
+        ModuleSupervisor(bus=bus, stats_every=stats_every).start()
+    else:
+        # Démarrage des modules (threads internes) : chacun publie sur le bus
+        from eye_tracking.eye_module import start_eye_tracking
+        from voice_transcription.voice_module import start_voice_recognition
+        start_eye_tracking(bus)
+        start_voice_recognition(bus)
+        start_gesture_recognition(bus)
 
     print("SmartVision Multimodal System started")
 
-    # 🔒 Mémoire de la dernière commande EYE (anti-répétition)
-    last_eye_content = None
-
-    while True:
-        voice_active = is_voice_active()
-        gesture_active = is_gesture_active()
-
-        mode = manager.decide_mode(
-            voice_active=voice_active,
-            gesture_active=gesture_active
-        )
-
-        content = ""
-
-        if mode == InputMode.VOICE:
-            content = get_voice_text()
-
-        elif mode == InputMode.GESTURE:
-            content = get_gesture_command()
-
-        elif mode == InputMode.EYE:
-            content = get_eye_command()
-
-            # 🔐 Sécurité médicale :
-            # empêcher l'envoi répété de la même commande oculaire
-            if content == last_eye_content:
-                content = ""
-
-            if content:
-                last_eye_content = content
+    # La priorité voix > geste > regard et la sécurité médicale
+    # (anti-répétition, cadence) sont des politiques par mode du ModeManager.
+    def on_intent(intent):
+        intent = manager.accept(intent)
 
         # Envoi vers l’avatar uniquement si une intention valide existe
-        if content:
-            intent = manager.build_intent(
-                mode=mode,
-                content=content,
-                confidence=1.0
-            )
+        if intent is not None:
             avatar_react(intent)
 
-        # ⏱️ Fréquence volontairement lente (sécurité médicale)
-        import time
-        time.sleep(0.5)
+    bus.subscribe(on_intent)
+
+    # Réveil dès qu'une intention arrive (plus de sleep(0.5))
+    bus.dispatch_forever()
 
 
 if __name__ == "__main__":
-    main_loop()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", action="store_true",
+                        help="un processus supervisé par module (regard, voix, geste)")
+    parser.add_argument("--stats-every", type=float, default=10.0,
+                        help="période d'affichage des statistiques des workers (s), 0 : jamais")
+    args = parser.parse_args()
+    main_loop(args.processes, args.stats_every)
@@ -2,18 +2,60 @@
 # =============================
 # Gestionnaire central des modes de communication
 
-from shared.protocol import InputMode, UserIntent
 import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from shared.protocol import InputMode, UserIntent
+
+
+# Priorité médicale : un indice plus petit préempte les suivants
+MODE_PRIORITY = [InputMode.VOICE, InputMode.GESTURE, InputMode.EYE]
+
+
+@dataclass
+class ModePolicy:
+    """
+    Politique de sécurité appliquée aux intentions d'un mode.
+
+    - min_interval : délai minimal (s) entre deux intentions acceptées
+    - suppress_repeat : rejeter une intention identique à la précédente
+    - hold : durée (s) pendant laquelle ce mode préempte les modes
+      de priorité inférieure après une intention acceptée
+    """
+    min_interval: float = 0.0
+    suppress_repeat: bool = False
+    hold: float = 0.0
+
+
+DEFAULT_POLICIES = {
+    InputMode.VOICE: ModePolicy(min_interval=0.0, suppress_repeat=False, hold=2.0),
+    InputMode.GESTURE: ModePolicy(min_interval=0.5, suppress_repeat=False, hold=1.0),
+    # 🔐 Sécurité médicale : pas de répétition, cadence limitée
+    InputMode.EYE: ModePolicy(min_interval=0.5, suppress_repeat=True, hold=0.0),
+}
 
 
 class ModeManager:
     """
     Décide automatiquement quel mode de communication utiliser
     selon l'activité détectée chez le patient.
+
+    L'anti-rebond et l'anti-répétition sont tenus par (mode, session) :
+    avec plusieurs lits, le "Rien" du lit 2 n'est pas comparé à celui du
+    lit 1. Une intention prioritaire préempte sa propre session, ou
+    toutes si elle n'en a pas (micro unique du poste).
     """
 
-    def __init__(self):
+    def __init__(self, policies: Optional[Dict[InputMode, ModePolicy]] = None):
         self.current_mode = InputMode.NONE
+        self.policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.policies.update(policies)
+
+        self._last_accept_time: Dict[Tuple[InputMode, str], float] = {}
+        self._last_content: Dict[Tuple[InputMode, str], str] = {}
+        self.rejected = 0
 
     def decide_mode(self, voice_active: bool, gesture_active: bool) -> InputMode:
         """
@@ -31,11 +73,58 @@ class ModeManager:
 
         return self.current_mode
 
+    def _preempted(self, mode: InputMode, session: str, now: float) -> bool:
+        if mode not in MODE_PRIORITY:
+            return False
+        for higher in MODE_PRIORITY[:MODE_PRIORITY.index(mode)]:
+            for key in ((higher, session), (higher, "")):
+                last = self._last_accept_time.get(key)
+                if last is not None and now - last < self.policies[higher].hold:
+                    return True
+        return False
+
+    def accept(self, intent: UserIntent) -> Optional[UserIntent]:
+        """
+        Applique la priorité médicale et la politique du mode à une
+        intention reçue sur le bus. Retourne l'intention si elle doit
+        être transmise à l'avatar, None sinon.
+        """
+        if not intent.content:
+            return None
+
+        # Instant d'arrivée : les modules publient dans le désordre (une
+        # phrase est transcrite bien après son début), un écart calculé sur
+        # intent.monotonic pourrait être négatif. intent.monotonic ne sert
+        # qu'à mesurer la latence de bout en bout.
+        now = time.monotonic()
+        policy = self.policies.get(intent.mode, ModePolicy())
+        key = (intent.mode, intent.session)
+
+        if self._preempted(intent.mode, intent.session, now):
+            self.rejected += 1
+            return None
+
+        last = self._last_accept_time.get(key)
+        if last is not None and now - last < policy.min_interval:
+            self.rejected += 1
+            return None
+
+        if policy.suppress_repeat and intent.content == self._last_content.get(key):
+            self.rejected += 1
+            return None
+
+        self._last_accept_time[key] = now
+        self._last_content[key] = intent.content
+        self.current_mode = intent.mode
+        return intent
+
     def build_intent(
         self,
         mode: InputMode,
         content: str,
-        confidence: float = 1.0
+        confidence: float = 1.0,
+        source: str = "mode_manager",
+        session: str = ""
     ) -> UserIntent:
         """
         Construit un message standardisé à destination de l’avatar
@@ -45,5 +134,6 @@ class ModeManager:
             mode=mode,
             content=content,
             confidence=confidence,
-            timestamp=time.time()
+            source=source,
+            session=session
         )
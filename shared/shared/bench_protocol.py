@@ -0,0 +1,62 @@
+# shared/bench_protocol.py
+# =========================
+# Débit encode / decode d'UserIntent : codec binaire (struct) vs JSON.
+#
+# Usage : python -m shared.bench_protocol [--count 200000]
+
+import argparse
+import json
+import time
+
+from shared.protocol import InputMode, UserIntent, decode_intent, encode_intent
+
+
+def json_encode(intent):
+    return json.dumps({
+        "mode": intent.mode.value, "content": intent.content, "confidence": intent.confidence,
+        "timestamp": intent.timestamp, "monotonic": intent.monotonic,
+        "source": intent.source, "session": intent.session, "seq": intent.seq,
+    }).encode("utf-8")
+
+
+def json_decode(data):
+    d = json.loads(data)
+    d["mode"] = InputMode(d["mode"])
+    return UserIntent(**d)
+
+
+def measure(name, encode, decode, intents):
+    start = time.perf_counter()
+    encoded = [encode(i) for i in intents]
+    enc = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = [decode(b) for b in encoded]
+    dec = time.perf_counter() - start
+
+    assert decoded == intents, f"{name}: round trip mismatch"
+    size = sum(len(b) for b in encoded) / len(encoded)
+    n = len(intents)
+    print(f"{name:<8} encode {n / enc / 1000:7.0f} k/s   decode {n / dec / 1000:7.0f} k/s   "
+          f"{size:5.1f} bytes/intent")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=200000)
+    args = parser.parse_args()
+
+    samples = [
+        (InputMode.EYE, "Consultation demandée", "eye", "lit-3"),
+        (InputMode.VOICE, "j'ai mal au dos depuis ce matin", "voice", "default"),
+        (InputMode.GESTURE, "Confort", "gesture", "lit-1"),
+    ]
+    intents = [UserIntent(mode=m, content=c, confidence=0.9, source=s, session=sess)
+               for i in range(args.count) for m, c, s, sess in [samples[i % len(samples)]]]
+
+    measure("struct", encode_intent, decode_intent, intents)
+    measure("json", json_encode, json_decode, intents)
+
+
+if __name__ == "__main__":
+    main()
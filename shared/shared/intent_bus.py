@@ -0,0 +1,78 @@
+# shared/intent_bus.py
+# =====================
+# Bus d'intentions (publish / subscribe) partagé entre tous les modules
+
+import queue
+import threading
+from typing import Callable, List, Optional
+
+from shared.protocol import UserIntent
+
+
+class IntentBus:
+    """
+    File bornée d'intentions UserIntent.
+
+    Les modules (regard, voix, geste) publient depuis leurs propres threads ;
+    un seul consommateur (ModeManager via main.py) les reçoit dans l'ordre
+    d'arrivée, sans attente active.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._subscribers: List[Callable[[UserIntent], None]] = []
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+        self.callback_errors = 0
+
+    def publish(self, intent: UserIntent) -> bool:
+        """
+        Dépose une intention sans jamais bloquer le thread producteur
+        (capture caméra / micro). Retourne False si la file est pleine.
+        """
+        try:
+            self._queue.put_nowait(intent)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.published += 1
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[UserIntent]:
+        """
+        Attend la prochaine intention (None si timeout écoulé).
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def subscribe(self, callback: Callable[[UserIntent], None]):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def dispatch_forever(self, stop_event: Optional[threading.Event] = None):
+        """
+        Boucle de distribution : réveillée dès qu'une intention arrive.
+        Le timeout ne sert qu'à vérifier périodiquement stop_event.
+        """
+        while stop_event is None or not stop_event.is_set():
+            intent = self.get(timeout=0.5)
+            if intent is None:
+                continue
+            with self._lock:
+                subscribers = list(self._subscribers)
+            for callback in subscribers:
+                try:
+                    callback(intent)
+                except Exception as e:
+                    # Un abonné en erreur (interface, TTS...) ne doit pas
+                    # arrêter la distribution pour tous les autres
+                    with self._lock:
+                        self.callback_errors += 1
+                    name = getattr(callback, "__qualname__", repr(callback))
+                    print(f"[BUS] Subscriber {name} failed on {intent.mode.value} "
+                          f"intent {intent.content!r}: {e!r}")
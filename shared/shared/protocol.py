@@ -1,10 +1,20 @@
 # shared/protocol.py
 # ===================
 # Langage commun entre tous les modules
+#
+# UserIntent est immuable et compact (__slots__) ; chaque intention porte
+# deux horodatages : `timestamp` (horloge murale, pour les journaux) et
+# `monotonic` (instant de capture, pour mesurer la latence de bout en
+# bout ; horloge commune à tous les processus d'une même machine). Les
+# intervalles du ModeManager se mesurent à l'arrivée, pas sur ce champ.
+# encode_intent / decode_intent : format binaire fixe (struct) pour
+# traverser files multiprocessing, pipes et sockets.
 
-from enum import Enum
-from dataclasses import dataclass
+import itertools
+import struct
 import time
+from dataclasses import dataclass, field
+from enum import Enum
 
 
 class InputMode(Enum):
@@ -14,9 +24,80 @@ class InputMode(Enum):
     NONE = "none"
 
 
-@dataclass
+# Numéro de séquence par processus (croissant, pour détecter pertes et doublons)
+_sequence = itertools.count(1)
+
+
+@dataclass(frozen=True, slots=True)
 class UserIntent:
     mode: InputMode
     content: str
-    confidence: float
-    timestamp: float = time.time()
+    confidence: float = 1.0
+    timestamp: float = field(default_factory=time.time)         # horloge murale (s depuis epoch)
+    monotonic: float = field(default_factory=time.monotonic)    # instant de capture
+    source: str = ""                                            # module émetteur : "eye", "voice", ...
+    session: str = ""                                           # caméra / lit / patient
+    seq: int = field(default_factory=lambda: next(_sequence))
+
+
+# ------------------------------------------------------------
+# Codec binaire
+# ------------------------------------------------------------
+#
+# En-tête little-endian de taille fixe, puis source, session et contenu en UTF-8 :
+#   version u8 | mode u8 | confidence f64 | timestamp f64 | monotonic f64 | seq u64
+#   | len(source) u8 | len(session) u8 | len(content) u32
+
+WIRE_VERSION = 1
+_HEADER = struct.Struct("<BBdddQBBI")
+_MODES = list(InputMode)
+_MODE_CODES = {mode: i for i, mode in enumerate(_MODES)}
+
+
+class ProtocolError(ValueError):
+    """Message binaire invalide ou d'une version inconnue"""
+
+
+def encode_intent(intent: UserIntent) -> bytes:
+    source = intent.source.encode("utf-8")
+    session = intent.session.encode("utf-8")
+    content = intent.content.encode("utf-8")
+    if len(source) > 255 or len(session) > 255:
+        raise ProtocolError("source and session ids are limited to 255 bytes")
+    return _HEADER.pack(WIRE_VERSION, _MODE_CODES[intent.mode], intent.confidence,
+                        intent.timestamp, intent.monotonic, intent.seq,
+                        len(source), len(session), len(content)) + source + session + content
+
+
+def decode_intent(data) -> UserIntent:
+    try:
+        (version, mode, confidence, timestamp, monotonic, seq,
+         n_source, n_session, n_content) = _HEADER.unpack_from(data)
+    except struct.error as e:
+        raise ProtocolError(f"truncated intent header: {e}")
+    if version != WIRE_VERSION:
+        raise ProtocolError(f"unsupported wire version {version}")
+    if mode >= len(_MODES):
+        raise ProtocolError(f"unknown input mode {mode}")
+
+    start = _HEADER.size
+    end = start + n_source + n_session + n_content
+    if len(data) < end:
+        raise ProtocolError("truncated intent payload")
+    payload = bytes(data[start:end])
+    try:
+        source = payload[:n_source].decode("utf-8")
+        session = payload[n_source:n_source + n_session].decode("utf-8")
+        content = payload[n_source + n_session:].decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise ProtocolError(f"invalid UTF-8 in intent: {e}")
+    return UserIntent(
+        mode=_MODES[mode],
+        content=content,
+        confidence=confidence,
+        timestamp=timestamp,
+        monotonic=monotonic,
+        source=source,
+        session=session,
+        seq=seq,
+    )
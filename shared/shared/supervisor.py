@@ -0,0 +1,309 @@
+# shared/supervisor.py
+# =====================
+# Un processus par modalité (regard, voix, geste), surveillé.
+#
+# Dans un seul interpréteur, MediaPipe, la reconnaissance vocale et
+# bientôt Whisper se partagent un GIL, et une exception native emporte
+# tout le système. Ici chaque module tourne dans son propre processus :
+#
+#   worker (eye)    ─┐
+#   worker (voice)  ─┼─ multiprocessing.Queue ─→ superviseur ─→ IntentBus ─→ ModeManager
+#   worker (gesture)─┘   (UserIntent encodés, battements de cœur)
+#
+# Le superviseur redémarre un worker mort, muet (plus de battement de
+# cœur depuis heartbeat_timeout) ou bloqué, avec un délai croissant s'il
+# replante aussitôt, et tient par worker : CPU, latence capture → bus, âge
+# du dernier battement, redémarrages.
+#
+# Le battement part de la boucle principale du worker : il prouve que le
+# processus vit, pas que le module avance. Chaque battement transporte
+# donc les compteurs de progression du module (images traitées, blocs
+# audio consommés) ; un compteur figé depuis progress_timeout (caméra
+# bloquée dans cap.read, VAD / ASR en interblocage...) vaut une panne.
+#
+#   supervisor = ModuleSupervisor(bus=bus).start()
+#   print(supervisor.stats())
+
+import importlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from shared.protocol import ProtocolError, decode_intent, encode_intent
+
+
+@dataclass
+class ModuleSpec:
+    start: str                      # "module:fonction", appelée avec un bus, retourne le thread du module
+    stats: Optional[str] = None     # "module:fonction" sans argument, statistiques propres au module
+    progress: Optional[str] = None  # "module:fonction" sans argument → {étage: compteur croissant}
+
+
+MODULES = {
+    "eye": ModuleSpec("eye_tracking.eye_module:start_eye_tracking",
+                      "eye_tracking.eye_module:get_eye_pipeline_stats",
+                      "eye_tracking.eye_module:get_eye_progress"),
+    "voice": ModuleSpec("voice_transcription.voice_module:start_voice_recognition",
+                        "voice_transcription.voice_module:get_voice_stats",
+                        "voice_transcription.voice_module:get_voice_progress"),
+    # Stub tant que le module gesture n'existe pas : le worker ne fait que battre
+    "gesture": ModuleSpec("main:start_gesture_recognition"),
+}
+
+
+def _resolve(target):
+    module_name, func_name = target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+class _QueueBus:
+    """Côté worker : même interface publish() qu'IntentBus, vers la file du superviseur"""
+
+    def __init__(self, name, out_queue):
+        self.name = name
+        self._queue = out_queue
+        self.published = 0
+
+    def publish(self, intent) -> bool:
+        self._queue.put(("intent", self.name, encode_intent(intent), time.monotonic()))
+        self.published += 1
+        return True
+
+
+def _module_worker(name, spec, out_queue, stop_event, heartbeat_every):
+    """Processus d'un module : le démarre, puis envoie un battement de cœur périodique"""
+    bus = _QueueBus(name, out_queue)
+    thread = _resolve(spec.start)(bus)
+    module_stats = _resolve(spec.stats) if spec.stats else None
+    module_progress = _resolve(spec.progress) if spec.progress else None
+
+    last_wall, last_cpu = time.monotonic(), time.process_time()
+    # Pas de stop_event.wait() : un worker tué (terminate) pendant qu'il
+    # attend sur l'Event laisse sa condition partagée incohérente, et le
+    # stop_event.set() du superviseur bloquerait ensuite pour toujours
+    while not stop_event.is_set():
+        time.sleep(heartbeat_every)
+        if thread is not None and not thread.is_alive():
+            # Thread du module terminé : on sort, le superviseur relance
+            raise SystemExit(1)
+        now, cpu = time.monotonic(), time.process_time()
+        out_queue.put(("heartbeat", name, {
+            "pid": os.getpid(),
+            "cpu_percent": 100.0 * (cpu - last_cpu) / max(now - last_wall, 1e-6),
+            "published": bus.published,
+            "module": module_stats() if module_stats is not None else None,
+            "progress": module_progress() if module_progress is not None else {},
+        }, now))
+        last_wall, last_cpu = now, cpu
+
+
+class _WorkerState:
+    def __init__(self, name, window=300):
+        self.name = name
+        self.process = None
+        self.started_at = None
+        self.last_heartbeat = None
+        self.heartbeat = {}
+        self.restarts = 0
+        self.backoff = 0.0
+        self.restart_at = None          # redémarrage programmé (time.monotonic)
+        self.intents = 0
+        self.bad_messages = 0           # intentions illisibles (ProtocolError)
+        self.progress = {}              # étage → (dernière valeur, instant où elle a changé)
+        self._latencies = deque(maxlen=window)
+
+    def update_progress(self, counters, now):
+        for stage, value in counters.items():
+            last = self.progress.get(stage)
+            if last is None or last[0] != value:
+                self.progress[stage] = (value, now)
+
+    def stalled_stage(self, now, timeout):
+        """Premier étage dont le compteur n'a pas bougé depuis `timeout` s (None si tous avancent)"""
+        for stage, (_, changed_at) in self.progress.items():
+            if now - changed_at > timeout:
+                return stage
+        return None
+
+    def snapshot(self, now):
+        lat = sorted(self._latencies)
+        alive = self.process is not None and self.process.is_alive()
+        return {
+            "pid": self.process.pid if alive else None,
+            "alive": alive,
+            "restarts": self.restarts,
+            "heartbeat_age_s": now - self.last_heartbeat if self.last_heartbeat is not None else None,
+            "cpu_percent": self.heartbeat.get("cpu_percent", 0.0),
+            "intents": self.intents,
+            "bad_messages": self.bad_messages,
+            "p50_ms": lat[len(lat) // 2] * 1000 if lat else 0.0,
+            "p95_ms": lat[int(len(lat) * 0.95)] * 1000 if lat else 0.0,
+            "module": self.heartbeat.get("module"),
+        }
+
+
+class ModuleSupervisor:
+    """
+    Lance un processus par module de `modules` (nom → ModuleSpec), publie
+    leurs intentions sur `bus` et les relance en cas de panne.
+
+    Un worker qui tient stable_after secondes retrouve un délai de
+    redémarrage nul ; sinon le délai double à chaque panne (min_backoff
+    → max_backoff).
+    """
+
+    def __init__(self, modules: Dict[str, ModuleSpec] = None, bus=None, heartbeat_every=1.0,
+                 heartbeat_timeout=5.0, startup_timeout=60.0, progress_timeout=15.0,
+                 min_backoff=1.0, max_backoff=30.0, stable_after=60.0, stats_every=0.0):
+        self.modules = dict(MODULES if modules is None else modules)
+        self.bus = bus
+        self.heartbeat_every = heartbeat_every
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_timeout = startup_timeout      # import de MediaPipe / modèles avant le 1er battement
+        self.progress_timeout = progress_timeout    # compteur de progression figé → redémarrage
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.stats_every = stats_every
+
+        # spawn : aucun worker n'hérite des threads ou de l'état natif du parent
+        self._ctx = multiprocessing.get_context("spawn")
+        self._queue = self._ctx.Queue()
+        self._stop_event = self._ctx.Event()
+        self._workers = {name: _WorkerState(name) for name in self.modules}
+        self._lock = threading.Lock()
+        self._running = False
+        self._threads = []
+
+    def _spawn(self, worker: _WorkerState):
+        worker.process = self._ctx.Process(
+            target=_module_worker, name=f"smartvision-{worker.name}", daemon=True,
+            args=(worker.name, self.modules[worker.name], self._queue, self._stop_event,
+                  self.heartbeat_every))
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.last_heartbeat = None
+        worker.progress = {}
+        worker.restart_at = None
+
+    def start(self):
+        self._running = True
+        with self._lock:
+            for worker in self._workers.values():
+                self._spawn(worker)
+        self._threads = [threading.Thread(target=self._drain, daemon=True),
+                         threading.Thread(target=self._watch, daemon=True)]
+        if self.stats_every > 0:
+            self._threads.append(threading.Thread(target=self._report_loop, daemon=True))
+        for t in self._threads:
+            t.start()
+        print(f"[SUPERVISOR] started {', '.join(self._workers)}")
+        return self
+
+    def _drain(self):
+        while self._running:
+            try:
+                kind, name, payload, ts = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            now = time.monotonic()
+            worker = self._workers[name]
+            if kind == "intent":
+                try:
+                    intent = decode_intent(payload)
+                except ProtocolError as e:
+                    # Un message illisible ne doit pas arrêter la collecte de tous les workers
+                    with self._lock:
+                        worker.bad_messages += 1
+                    print(f"[SUPERVISOR] {name}: dropped malformed intent ({e})")
+                    continue
+                with self._lock:
+                    worker.intents += 1
+                    # time.monotonic est commun aux processus d'une même machine
+                    worker._latencies.append(now - intent.monotonic)
+                if self.bus is not None:
+                    self.bus.publish(intent)
+            elif kind == "heartbeat":
+                with self._lock:
+                    worker.last_heartbeat = now
+                    worker.heartbeat = payload
+                    worker.update_progress(payload.get("progress") or {}, now)
+
+    def _watch(self):
+        while self._running:
+            time.sleep(self.heartbeat_every / 2)
+            now = time.monotonic()
+            with self._lock:
+                if not self._running:
+                    break
+                for worker in self._workers.values():
+                    self._check(worker, now)
+
+    def _check(self, worker: _WorkerState, now):
+        if worker.restart_at is not None:
+            if now >= worker.restart_at:
+                worker.restarts += 1
+                print(f"[SUPERVISOR] restarting {worker.name} (restart #{worker.restarts})")
+                self._spawn(worker)
+            return
+
+        alive = worker.process.is_alive()
+        if worker.last_heartbeat is None:
+            silent_for = now - worker.started_at
+            silent = silent_for > self.startup_timeout
+        else:
+            silent_for = now - worker.last_heartbeat
+            silent = silent_for > self.heartbeat_timeout
+        stalled = worker.stalled_stage(now, self.progress_timeout)
+        if alive and not silent and stalled is None:
+            return
+
+        if alive:
+            if silent:
+                print(f"[SUPERVISOR] {worker.name} silent for {silent_for:.1f}s, killing")
+            else:
+                print(f"[SUPERVISOR] {worker.name} stalled ({stalled} not advancing for "
+                      f"{self.progress_timeout:.0f}s), killing")
+            worker.process.terminate()
+            worker.process.join(1.0)
+        else:
+            print(f"[SUPERVISOR] {worker.name} exited (code {worker.process.exitcode})")
+
+        if now - worker.started_at >= self.stable_after:
+            worker.backoff = 0.0
+        else:
+            worker.backoff = min(self.max_backoff, max(self.min_backoff, 2 * worker.backoff))
+        worker.restart_at = now + worker.backoff
+
+    def stats(self):
+        """Par worker : pid, vivant, redémarrages, CPU, latence capture → bus, âge du battement"""
+        now = time.monotonic()
+        with self._lock:
+            return {name: w.snapshot(now) for name, w in self._workers.items()}
+
+    def _report_loop(self):
+        while self._running:
+            time.sleep(self.stats_every)
+            for name, s in self.stats().items():
+                age = s["heartbeat_age_s"]
+                print(f"[SUPERVISOR] {name:<8} pid {s['pid']}  cpu {s['cpu_percent']:5.1f}%  "
+                      f"intents {s['intents']}  p50 {s['p50_ms']:.1f} ms  p95 {s['p95_ms']:.1f} ms  "
+                      f"heartbeat {'-' if age is None else f'{age:.1f}s'}  restarts {s['restarts']}")
+
+    def stop(self, timeout=5.0):
+        with self._lock:
+            self._running = False
+        self._stop_event.set()
+        for worker in self._workers.values():
+            if worker.process is None:
+                continue
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        for t in self._threads:
+            t.join(timeout)
@@ -0,0 +1,176 @@
+# voice_transcription/asr_engine.py
+# ==================================
+# Moteurs ASR interchangeables derrière une interface commune :
+#     engine.transcribe(audio_float32_16k, language="en")["text"]
+#
+# Transcription en flux (hypothèses partielles pendant que le patient parle) :
+#     stream = engine.stream(language="fr")
+#     partial = stream.accept(block)      # texte partiel mis à jour, ou None
+#     result = stream.finish()            # {"text": ..., "confidence": ...}
+
+import json
+import math
+import os
+
+import numpy as np
+
+ASR_BACKEND = os.environ.get("ASR_BACKEND", "whisper")   # "whisper", "faster-whisper" ou "vosk"
+ASR_MODEL = os.environ.get("ASR_MODEL", "medium")         # tiny / base / small / medium, ou dossier Vosk
+RATE = 16000
+
+
+class ChunkedStream:
+    """
+    Flux pour les moteurs Whisper (sans décodage incrémental natif) :
+    l'audio est accumulé et re-transcrit en entier toutes les
+    `partial_every` secondes d'audio nouveau pour produire le partiel.
+    """
+
+    def __init__(self, engine, language="en", partial_every=0.5, rate=RATE):
+        self.engine = engine
+        self.language = language
+        self.partial_step = int(partial_every * rate)
+        self._blocks = []
+        self._samples = 0
+        self._next_partial = self.partial_step
+        self.partial = ""
+
+    def _audio(self):
+        return np.concatenate(self._blocks) if self._blocks else np.zeros(0, dtype=np.float32)
+
+    def accept(self, block):
+        self._blocks.append(np.asarray(block, dtype=np.float32))
+        self._samples += len(block)
+        if self.partial_step <= 0 or self._samples < self._next_partial:
+            return None
+        self._next_partial = self._samples + self.partial_step
+        text = self.engine.transcribe(self._audio(), language=self.language)["text"].strip()
+        if text == self.partial:
+            return None
+        self.partial = text
+        return text
+
+    def finish(self):
+        if not self._samples:
+            return {"text": "", "confidence": 0.0}
+        result = self.engine.transcribe(self._audio(), language=self.language)
+        return {"text": result["text"].strip(), "confidence": result.get("confidence", 1.0)}
+
+
+class WhisperEngine:
+    """openai-whisper (PyTorch, fp32 sur CPU)"""
+
+    name = "whisper"
+
+    def __init__(self, model_size="medium", device="cpu"):
+        import whisper
+        self.model_size = model_size
+        self.model = whisper.load_model(model_size, device=device)
+
+    def transcribe(self, audio, language="en"):
+        # fp16 indisponible sur CPU : on évite l'avertissement et la conversion
+        result = self.model.transcribe(audio, language=language, fp16=False)
+        return {"text": result["text"]}
+
+    def stream(self, language="en", partial_every=1.0):
+        # Modèle PyTorch lent sur CPU : partiels plus espacés
+        return ChunkedStream(self, language, partial_every)
+
+
+class FasterWhisperEngine:
+    """faster-whisper (CTranslate2), quantification int8 par défaut sur CPU"""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size="small", device="cpu", compute_type="int8", cpu_threads=0):
+        from faster_whisper import WhisperModel
+        self.model_size = model_size
+        self.model = WhisperModel(model_size, device=device,
+                                  compute_type=compute_type, cpu_threads=cpu_threads)
+
+    def transcribe(self, audio, language="en"):
+        # Décodage glouton : la réponse patient est courte, beam_size=1 suffit
+        segments, _ = self.model.transcribe(audio, language=language, beam_size=1)
+        segments = list(segments)
+        # Confiance : probabilité moyenne par token des segments décodés
+        confidence = (math.exp(sum(seg.avg_logprob for seg in segments) / len(segments))
+                      if segments else 0.0)
+        return {"text": "".join(seg.text for seg in segments), "confidence": confidence}
+
+    def stream(self, language="en", partial_every=0.5):
+        return ChunkedStream(self, language, partial_every)
+
+
+class VoskStream:
+    """Décodage incrémental Kaldi : chaque bloc met à jour l'hypothèse partielle"""
+
+    def __init__(self, model, rate=RATE):
+        from vosk import KaldiRecognizer
+        self.recognizer = KaldiRecognizer(model, rate)
+        self.recognizer.SetWords(True)
+        self.partial = ""
+        self._segments = []             # segments finalisés par Vosk sur ses propres pauses
+
+    def accept(self, block):
+        pcm = (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+        if self.recognizer.AcceptWaveform(pcm):
+            self._segments.append(json.loads(self.recognizer.Result()))
+            text = " ".join(seg.get("text", "") for seg in self._segments).strip()
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+            text = " ".join([seg.get("text", "") for seg in self._segments] + [partial]).strip()
+        if text == self.partial:
+            return None
+        self.partial = text
+        return text
+
+    def finish(self):
+        self._segments.append(json.loads(self.recognizer.FinalResult()))
+        words = [w for seg in self._segments for w in seg.get("result", [])]
+        text = " ".join(seg.get("text", "") for seg in self._segments if seg.get("text")).strip()
+        confidence = sum(w["conf"] for w in words) / len(words) if words else 0.0
+        return {"text": text, "confidence": confidence}
+
+
+class VoskEngine:
+    """Vosk (Kaldi), hors ligne, décodage en flux sur CPU ; un modèle par langue"""
+
+    name = "vosk"
+
+    def __init__(self, model_size=None, device="cpu"):
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        # model_size : dossier du modèle téléchargé ; les tailles Whisper
+        # (ASR_MODEL=medium...) sont sans objet ici → VOSK_MODEL
+        if model_size is None or not os.path.isdir(model_size):
+            model_size = os.environ.get("VOSK_MODEL", "models/vosk-model-small-fr-0.22")
+        self.model_size = model_size
+        self.model = Model(self.model_size)
+
+    def stream(self, language=None, partial_every=None):
+        # La langue est celle du modèle chargé
+        return VoskStream(self.model)
+
+    def transcribe(self, audio, language=None):
+        stream = self.stream()
+        stream.accept(audio)
+        return stream.finish()
+
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+    VoskEngine.name: VoskEngine,
+}
+
+
+def load_engine(backend=None, model_size=None, **kwargs):
+    """
+    Instancie le moteur choisi pour ce déploiement.
+    Par défaut : variables d'environnement ASR_BACKEND / ASR_MODEL.
+    """
+    backend = backend or ASR_BACKEND
+    model_size = model_size or ASR_MODEL
+    if backend not in ENGINES:
+        raise ValueError(f"Unknown ASR backend '{backend}' (available: {', '.join(ENGINES)})")
+    return ENGINES[backend](model_size=model_size, **kwargs)
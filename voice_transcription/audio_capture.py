@@ -0,0 +1,347 @@
+# voice_transcription/audio_capture.py
+# =====================================
+# Capture micro en flux continu, segmentée par détection d'activité vocale
+#
+#   record_utterance()   un InputStream ouvert le temps d'un énoncé (vocal.py)
+#   MicStream + Endpointer  un seul InputStream pour toute la session : le
+#       callback PortAudio remplit un tampon circulaire, la segmentation se
+#       fait sur l'audio tamponné ; rien n'est perdu pendant la transcription
+#       ni entre deux énoncés (voice_module)
+
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import sounddevice as sd
+import soundfile as sf
+
+RATE = 16000
+BLOCK_MS = 30
+
+
+class EnergyVAD:
+    """
+    Détecteur d'activité vocale par énergie (RMS) par blocs de BLOCK_MS.
+
+    Le seuil suit le bruit de fond estimé sur les blocs silencieux ;
+    l'énoncé se termine après `trailing_silence` secondes sans parole.
+    """
+
+    def __init__(self, rate=RATE, block_ms=BLOCK_MS, trailing_silence=0.8,
+                 min_speech=0.15, ratio=3.0, min_rms=0.005):
+        self.block_s = block_ms / 1000.0
+        self.block_samples = int(rate * block_ms / 1000)
+        self.trailing_blocks = max(1, int(round(trailing_silence / self.block_s)))
+        self.min_speech_blocks = max(1, int(round(min_speech / self.block_s)))
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.noise_floor = min_rms / ratio
+        self.reset()
+
+    def reset(self):
+        self.speech_blocks = 0
+        self.silence_blocks = 0
+        self.triggered = False
+
+    def calibrate(self, audio):
+        """
+        Ré-estime le bruit de fond sur un extrait récent (plusieurs secondes) :
+        10e centile des RMS par bloc, pour que la parole éventuelle de
+        l'extrait ne gonfle pas l'estimation. Rattrape une hausse brusque du
+        bruit ambiant, que la moyenne glissante (blocs silencieux seulement)
+        ne suit pas.
+        """
+        n = len(audio) // self.block_samples
+        if n == 0:
+            return
+        blocks = np.asarray(audio[:n * self.block_samples], dtype=np.float32).reshape(n, -1)
+        rms = np.sqrt(np.mean(np.square(blocks), axis=1))
+        self.noise_floor = float(np.percentile(rms, 10))
+
+    def is_speech(self, block) -> bool:
+        rms = float(np.sqrt(np.mean(np.square(block, dtype=np.float32))))
+        speech = rms > max(self.min_rms, self.noise_floor * self.ratio)
+        if not speech:
+            # Moyenne glissante lente du bruit de fond
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return speech
+
+    def update(self, block) -> bool:
+        """
+        Traite un bloc ; retourne True quand l'énoncé est terminé.
+        """
+        if self.is_speech(block):
+            self.speech_blocks += 1
+            self.silence_blocks = 0
+            if self.speech_blocks >= self.min_speech_blocks:
+                self.triggered = True
+        else:
+            self.silence_blocks += 1
+            if not self.triggered:
+                self.speech_blocks = 0
+
+        return self.triggered and self.silence_blocks >= self.trailing_blocks
+
+
+def record_utterance(max_duration=8.0, trailing_silence=0.8, start_timeout=5.0,
+                     rate=RATE, vad=None, on_block=None):
+    """
+    Enregistre un énoncé via un InputStream sounddevice : la capture
+    s'arrête après `trailing_silence` s de silence suivant la parole,
+    au plus tard après `max_duration` s (ou `start_timeout` s sans parole).
+
+    `on_block(block, vad)` est appelé pour chaque bloc (ASR en flux,
+    détection de début de parole).
+
+    Retourne un tableau float32 mono prêt pour l'ASR, ou None si aucun
+    échantillon n'a été reçu (micro muet, flux interrompu).
+    """
+    vad = vad or EnergyVAD(rate=rate, trailing_silence=trailing_silence)
+    vad.reset()
+
+    block_size = int(rate * BLOCK_MS / 1000)
+    max_samples = int(max_duration * rate)
+    buffer = np.empty(max_samples, dtype=np.float32)
+    blocks = queue.Queue()
+
+    def callback(indata, frames, time_info, status):
+        blocks.put(indata[:, 0].copy())
+
+    n = 0
+    start = time.monotonic()
+    with sd.InputStream(samplerate=rate, channels=1, dtype="float32",
+                        blocksize=block_size, callback=callback):
+        while n < max_samples:
+            try:
+                block = blocks.get(timeout=1.0)
+            except queue.Empty:
+                break
+
+            take = min(len(block), max_samples - n)
+            buffer[n:n + take] = block[:take]
+            n += take
+
+            done = vad.update(block)
+            if on_block is not None:
+                on_block(block, vad)
+            if done:
+                break
+            if not vad.triggered and time.monotonic() - start > start_timeout:
+                break
+
+    if n == 0:
+        return None
+    return buffer[:n]
+
+
+class AudioRing:
+    """
+    Tampon circulaire d'échantillons float32, écrit par le callback audio
+    et lu par un seul consommateur. Les positions sont absolues (nombre
+    d'échantillons depuis le démarrage) ; un lecteur trop lent perd les
+    plus anciens échantillons, comptés dans `overrun`.
+    """
+
+    def __init__(self, seconds=10.0, rate=RATE):
+        self.rate = rate
+        self.size = int(seconds * rate)
+        self._buf = np.zeros(self.size, dtype=np.float32)
+        self._cond = threading.Condition()
+        self.written = 0
+        self.last_time = None           # time.monotonic() de la fin du dernier bloc écrit
+        self.overrun = 0
+        self.closed = False
+
+    def write(self, samples, t=None):
+        n = len(samples)
+        with self._cond:
+            start = self.written % self.size
+            first = min(n, self.size - start)
+            self._buf[start:start + first] = samples[:first]
+            if n > first:
+                self._buf[:n - first] = samples[first:]
+            self.written += n
+            self.last_time = time.monotonic() if t is None else t
+            self._cond.notify_all()
+
+    def read(self, pos, n, timeout=None):
+        """
+        Copie de n échantillons à partir de `pos` ; attend qu'ils soient
+        écrits. Retourne (pos, audio), pos avancée si le début a été écrasé,
+        ou (pos, None) au timeout / à la fermeture.
+        """
+        with self._cond:
+            ready = self._cond.wait_for(lambda: self.written >= pos + n or self.closed, timeout)
+            if not ready or self.written < pos + n:
+                return pos, None
+            oldest = self.written - self.size
+            if pos < oldest:
+                self.overrun += oldest - pos
+                pos = oldest
+                n = min(n, self.written - pos)
+            start = pos % self.size
+            first = min(n, self.size - start)
+            out = np.empty(n, dtype=np.float32)
+            out[:first] = self._buf[start:start + first]
+            out[first:] = self._buf[:n - first]
+            return pos, out
+
+    def time_of(self, pos):
+        """Instant time.monotonic() approximatif de l'échantillon `pos`"""
+        with self._cond:
+            if self.last_time is None:
+                return time.monotonic()
+            return self.last_time - (self.written - pos) / self.rate
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class MicStream:
+    """
+    Un InputStream ouvert une fois pour toute la session, qui alimente un
+    AudioRing. Le callback ne fait qu'une copie dans le tampon.
+
+        mic = MicStream().start()
+        ...
+        mic.close()
+    """
+
+    def __init__(self, rate=RATE, block_ms=BLOCK_MS, ring_seconds=10.0, device=None):
+        self.rate = rate
+        self.block_size = int(rate * block_ms / 1000)
+        self.device = device
+        self.ring = AudioRing(ring_seconds, rate)
+        self.overflows = 0              # blocs perdus côté PortAudio
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status.input_overflow:
+            self.overflows += 1
+        self.ring.write(indata[:, 0])
+
+    def start(self):
+        self._stream = sd.InputStream(samplerate=self.rate, channels=1, dtype="float32",
+                                      blocksize=self.block_size, device=self.device,
+                                      callback=self._callback)
+        self._stream.start()
+        return self
+
+    def is_active(self) -> bool:
+        """False si le flux est fermé ou si PortAudio l'a arrêté (micro débranché)"""
+        return self._stream is not None and self._stream.active
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        self.ring.close()
+
+
+class Endpointer:
+    """
+    Segmentation en énoncés sur l'audio tamponné d'un AudioRing.
+
+    Lecture bloc par bloc à partir de la dernière position lue : la fin
+    d'un énoncé et le début du suivant ne sont jamais séparés par un trou.
+    Au déclenchement du VAD, l'énoncé démarre `pre_roll` s avant les blocs
+    de parole détectés (attaque des consonnes non coupée). Hors parole, le
+    bruit de fond est recalibré toutes les `recalibrate_every` s sur les
+    `calibration_window` dernières secondes, et immédiatement après un
+    énoncé coupé à max_duration (bruit ambiant pris pour de la parole).
+    """
+
+    def __init__(self, ring: AudioRing, vad=None, block_ms=BLOCK_MS, pre_roll=0.3,
+                 max_duration=8.0, recalibrate_every=30.0, calibration_window=8.0):
+        self.ring = ring
+        self.vad = vad or EnergyVAD(rate=ring.rate, block_ms=block_ms)
+        self.block_size = int(ring.rate * block_ms / 1000)
+        self.pre_roll = int(pre_roll * ring.rate)
+        self.max_samples = int(max_duration * ring.rate)
+        self.recalibrate_every = int(recalibrate_every * ring.rate)
+        self.calibration_window = int(calibration_window * ring.rate)
+        if self.max_samples + self.pre_roll > ring.size:
+            raise ValueError("ring buffer too small for max_duration + pre_roll")
+
+        self.pos = ring.written         # prochaine position à lire
+        self._last_end = self.pos       # fin du dernier énoncé (borne du pre-roll)
+        self._last_calibration = None
+        self.recalibrations = 0
+        self.blocks = 0                 # progression : blocs audio consommés
+
+    def _maybe_recalibrate(self):
+        if self.recalibrate_every <= 0 or self.vad.speech_blocks:
+            return
+        due = (self._last_calibration is None and self.pos >= self.calibration_window) or \
+              (self._last_calibration is not None and self.pos - self._last_calibration >= self.recalibrate_every)
+        if due:
+            self._recalibrate()
+
+    def _recalibrate(self):
+        start = max(0, self.pos - self.calibration_window, self.ring.written - self.ring.size)
+        _, audio = self.ring.read(start, self.pos - start, timeout=0)
+        if audio is not None:
+            self.vad.calibrate(audio)
+            self.recalibrations += 1
+        self._last_calibration = self.pos
+
+    def listen(self, on_start=None, on_block=None, timeout=1.0):
+        """
+        Attend la fin du prochain énoncé. `on_start(onset_time)` est appelé
+        au déclenchement, `on_block(audio)` avec le pre-roll puis chaque bloc
+        de parole (ASR en flux).
+
+        Retourne (audio, position de début, instant de début) ou None si le
+        flux est fermé / muet depuis `timeout` s.
+        """
+        self.vad.reset()
+        start = None
+        while True:
+            self.pos, block = self.ring.read(self.pos, self.block_size, timeout)
+            if block is None:
+                return None
+            self.pos += len(block)
+            self.blocks += 1
+            done = self.vad.update(block)
+
+            if start is None:
+                if not self.vad.triggered:
+                    self._maybe_recalibrate()
+                    continue
+                # Début : blocs de parole déjà vus + pre-roll, sans empiéter sur l'énoncé précédent
+                speech = self.vad.speech_blocks * self.block_size
+                start = max(self._last_end, self.pos - speech - self.pre_roll,
+                            self.ring.written - self.ring.size)
+                if on_start is not None:
+                    on_start(self.ring.time_of(start))
+                if on_block is not None:
+                    _, head = self.ring.read(start, self.pos - start, timeout=0)
+                    if head is not None:
+                        on_block(head)
+            elif on_block is not None:
+                on_block(block)
+
+            if done or self.pos - start >= self.max_samples:
+                if not done and self.recalibrate_every > 0:
+                    self._recalibrate()
+                self._last_end = self.pos
+                start, audio = self.ring.read(start, self.pos - start, timeout=0)
+                return audio, start, self.ring.time_of(start)
+
+
+def archive_wav_async(audio, directory="recordings", rate=RATE):
+    """
+    Archivage optionnel d'un énoncé en WAV sur un thread séparé :
+    le chemin critique capture → débruitage → ASR ne touche pas le disque.
+    Nom de fichier unique (pid + horodatage) pour permettre plusieurs
+    sessions dans le même dossier de travail.
+    """
+    os.makedirs(directory, exist_ok=True)
+    filename = os.path.join(directory, f"patient_{os.getpid()}_{time.time_ns()}.wav")
+    threading.Thread(target=sf.write, args=(filename, audio, rate), daemon=True).start()
+    return filename
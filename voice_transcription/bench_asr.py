@@ -0,0 +1,95 @@
+# voice_transcription/bench_asr.py
+# =================================
+# Benchmark des moteurs ASR : facteur temps réel (RTF) et WER
+#
+# Usage :
+#   python bench_asr.py <dossier_de_clips> whisper:medium faster-whisper:small faster-whisper:base
+# Chaque clip <nom>.wav (16 kHz mono) est accompagné de sa transcription
+# de référence <nom>.txt.
+
+import argparse
+import glob
+import os
+import re
+import time
+
+import soundfile as sf
+
+from asr_engine import load_engine
+
+RATE = 16000
+
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9' ]", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """Distance d'édition au niveau des mots / nombre de mots de référence"""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h))
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def load_clips(directory):
+    clips = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        ref_path = os.path.splitext(path)[0] + ".txt"
+        if not os.path.exists(ref_path):
+            continue
+        audio, sr = sf.read(path, dtype="float32")
+        if audio.ndim > 1:
+            audio = audio[:, 0]
+        if sr != RATE:
+            print(f"⚠️ {path}: {sr} Hz ignoré (attendu {RATE})")
+            continue
+        with open(ref_path, encoding="utf-8") as f:
+            clips.append((os.path.basename(path), audio, f.read().strip()))
+    return clips
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clips")
+    parser.add_argument("engines", nargs="+", help="backend:model, ex. faster-whisper:small")
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips)
+    if not clips:
+        print("Aucun clip (wav + txt) trouvé.")
+        return
+    audio_seconds = sum(len(a) for _, a, _ in clips) / RATE
+
+    print(f"{len(clips)} clips, {audio_seconds:.1f} s d'audio")
+    print(f"{'engine':28s} {'load (s)':>9s} {'RTF':>7s} {'WER':>7s} {'max clip (s)':>13s}")
+
+    for spec in args.engines:
+        backend, _, model_size = spec.partition(":")
+        t0 = time.perf_counter()
+        engine = load_engine(backend, model_size or None)
+        load_time = time.perf_counter() - t0
+
+        # Passe de chauffe (allocation, JIT) exclue de la mesure
+        engine.transcribe(clips[0][1][:RATE], language=args.language)
+
+        total, worst, errors = 0.0, 0.0, 0.0
+        for _, audio, reference in clips:
+            t0 = time.perf_counter()
+            text = engine.transcribe(audio, language=args.language)["text"]
+            elapsed = time.perf_counter() - t0
+            total += elapsed
+            worst = max(worst, elapsed)
+            errors += word_error_rate(reference, text)
+
+        print(f"{spec:28s} {load_time:9.2f} {total / audio_seconds:7.3f} "
+              f"{errors / len(clips) * 100:6.1f}% {worst:13.2f}")
+
+
+if __name__ == "__main__":
+    main()
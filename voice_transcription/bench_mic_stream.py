@@ -0,0 +1,150 @@
+# voice_transcription/bench_mic_stream.py
+# ========================================
+# Benchmark hors ligne : flux micro unique + tampon circulaire (MicStream /
+# Endpointer) vs un InputStream rouvert à chaque écoute (ancienne boucle
+# de voice_module).
+#
+# Usage : python bench_mic_stream.py [--minutes 10] [--reopen-ms 40] [--decode-ms 300]
+#                                    [--measure-device]
+#
+# Session synthétique : bruit de fond (qui monte brusquement à mi-session,
+# ventilation allumée) et énoncés de 0.4 à 2.5 s, dont un tiers enchaînés
+# rapidement. Un début d'énoncé est "manqué" s'il n'est couvert par aucun
+# segment capturé commençant au plus ONSET_TOLERANCE s après lui.
+# Ancienne boucle : l'audio est perdu pendant chaque réouverture du flux
+# (--reopen-ms, mesurable avec --measure-device) et pendant la
+# transcription (--decode-ms).
+
+import argparse
+import time
+
+import numpy as np
+
+from audio_capture import BLOCK_MS, RATE, AudioRing, Endpointer, EnergyVAD
+
+ONSET_TOLERANCE = 0.1
+
+
+def synth_session(seconds, seed=0, noise=0.003, loud_noise=0.02):
+    rng = np.random.default_rng(seed)
+    n = int(seconds * RATE)
+    audio = rng.normal(0, noise, n).astype(np.float32)
+    audio[n // 2:] *= loud_noise / noise
+
+    utterances = []
+    t = 1.0
+    while True:
+        duration = rng.uniform(0.4, 2.5)
+        start, end = int(t * RATE), int((t + duration) * RATE)
+        if end >= n:
+            break
+        k = np.arange(end - start) / RATE
+        envelope = np.minimum(1.0, np.minimum(k, duration - k) / 0.03)
+        voice = sum(np.sin(2 * np.pi * f * k) / i for i, f in enumerate((180, 360, 540), 1))
+        audio[start:end] += (0.1 * envelope * voice * rng.uniform(0.5, 1.5, end - start)).astype(np.float32)
+        utterances.append((start, end))
+        t += duration + (rng.uniform(0.2, 0.6) if rng.random() < 0.33 else rng.exponential(2.5) + 0.5)
+    return audio, utterances
+
+
+def legacy_segments(audio, reopen_ms, decode_ms, max_duration=4.0, start_timeout=1.0):
+    """Rejoue record_utterance (flux ouvert par écoute, VAD neuf) ; retourne les segments et le nombre d'ouvertures"""
+    block = int(RATE * BLOCK_MS / 1000)
+    reopen, decode = int(reopen_ms / 1000 * RATE), int(decode_ms / 1000 * RATE)
+    segments, opens, pos = [], 0, 0
+    while pos < len(audio):
+        pos += reopen                   # audio perdu pendant l'ouverture PortAudio
+        opens += 1
+        vad = EnergyVAD()
+        start, n = pos, 0
+        while n < max_duration * RATE and start + n + block <= len(audio):
+            b = audio[start + n:start + n + block]
+            n += block
+            if vad.update(b):
+                break
+            if not vad.triggered and n / RATE > start_timeout:
+                break
+        pos = start + n
+        if start + n + block > len(audio):
+            break
+        if vad.triggered:
+            segments.append((start, pos))
+            pos += decode               # micro fermé pendant la transcription
+    return segments, opens
+
+
+def ring_segments(audio, recalibrate_every=30.0):
+    ring = AudioRing(len(audio) / RATE + 1, RATE)
+    endpointer = Endpointer(ring, EnergyVAD(), max_duration=4.0, recalibrate_every=recalibrate_every)
+    block = int(RATE * BLOCK_MS / 1000)
+    for i in range(0, len(audio) - block + 1, block):
+        ring.write(audio[i:i + block])
+    ring.close()
+
+    segments = []
+    while True:
+        heard = endpointer.listen(timeout=0)
+        if heard is None:
+            break
+        segment, start, _ = heard
+        segments.append((start, start + len(segment)))
+    return segments, endpointer.recalibrations
+
+
+def score(segments, utterances):
+    tol = int(ONSET_TOLERANCE * RATE)
+    missed = sum(1 for u0, _ in utterances
+                 if not any(s0 <= u0 + tol and s1 > u0 for s0, s1 in segments))
+    false = sum(1 for s0, s1 in segments if not any(s0 < u1 and s1 > u0 for u0, u1 in utterances))
+    return missed, false
+
+
+def measure_device(repeats=20):
+    """Coût réel d'ouverture + fermeture d'un InputStream sur ce poste (ms)"""
+    import sounddevice as sd
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        with sd.InputStream(samplerate=RATE, channels=1, dtype="float32",
+                            blocksize=int(RATE * BLOCK_MS / 1000)):
+            pass
+        times.append((time.perf_counter() - t0) * 1000)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--reopen-ms", type=float, default=40.0)
+    parser.add_argument("--decode-ms", type=float, default=300.0)
+    parser.add_argument("--measure-device", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    reopen_ms = args.reopen_ms
+    if args.measure_device:
+        reopen_ms = measure_device()
+        print(f"Ouverture + fermeture InputStream mesurée : {reopen_ms:.1f} ms")
+
+    audio, utterances = synth_session(args.minutes * 60, args.seed)
+    seconds = len(audio) / RATE
+    print(f"{seconds / 60:.0f} min d'audio, {len(utterances)} énoncés")
+    print(f"{'capture':22s} {'segments':>9s} {'débuts manqués':>15s} {'faux':>6s} {'CPU ms/min':>11s}  notes")
+
+    t0 = time.process_time()
+    segments, opens = legacy_segments(audio, reopen_ms, args.decode_ms)
+    cpu = (time.process_time() - t0) * 1000 / (seconds / 60)
+    missed, false = score(segments, utterances)
+    print(f"{'flux rouvert':22s} {len(segments):9d} {missed:8d} ({missed / len(utterances):5.1%}) {false:6d} "
+          f"{cpu:11.1f}  {opens} ouvertures (+{opens * reopen_ms / 1000:.1f} s micro fermé)")
+
+    t0 = time.process_time()
+    segments, recalibrations = ring_segments(audio)
+    cpu = (time.process_time() - t0) * 1000 / (seconds / 60)
+    missed, false = score(segments, utterances)
+    print(f"{'flux unique + anneau':22s} {len(segments):9d} {missed:8d} ({missed / len(utterances):5.1%}) {false:6d} "
+          f"{cpu:11.1f}  1 ouverture, {recalibrations} recalibrations")
+
+
+if __name__ == "__main__":
+    main()
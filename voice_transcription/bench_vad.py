@@ -0,0 +1,74 @@
+# voice_transcription/bench_vad.py
+# =================================
+# Benchmark hors ligne : durée de capture VAD vs capture fixe de 8 s
+#
+# Usage : python bench_vad.py <dossier_de_wav> [--max 8] [--silence 0.8]
+# Chaque WAV (16 kHz mono) représente une réponse patient enregistrée
+# depuis l'appui sur "Speak".
+
+import argparse
+import glob
+import os
+import statistics
+
+import numpy as np
+import soundfile as sf
+
+from audio_capture import BLOCK_MS, RATE, EnergyVAD
+
+
+def simulated_capture_time(audio, max_duration, trailing_silence, start_timeout=5.0):
+    """
+    Rejoue le signal bloc par bloc comme le ferait record_utterance
+    et retourne l'instant (s) où la capture s'arrêterait.
+    """
+    vad = EnergyVAD(rate=RATE, trailing_silence=trailing_silence)
+    block_size = int(RATE * BLOCK_MS / 1000)
+    max_samples = int(max_duration * RATE)
+
+    n = 0
+    while n < max_samples:
+        block = audio[n:n + block_size]
+        if len(block) < block_size:
+            # Fin de l'enregistrement : silence jusqu'à la limite
+            block = np.zeros(block_size, dtype=np.float32)
+        n += block_size
+        if vad.update(block):
+            break
+        if not vad.triggered and n / RATE > start_timeout:
+            break
+    return min(n, max_samples) / RATE
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clips")
+    parser.add_argument("--max", type=float, default=8.0)
+    parser.add_argument("--silence", type=float, default=0.8)
+    args = parser.parse_args()
+
+    fixed, vad = [], []
+    for path in sorted(glob.glob(os.path.join(args.clips, "*.wav"))):
+        audio, sr = sf.read(path, dtype="float32")
+        if audio.ndim > 1:
+            audio = audio[:, 0]
+        if sr != RATE:
+            print(f"⚠️ {path}: {sr} Hz ignoré (attendu {RATE})")
+            continue
+        t = simulated_capture_time(audio, args.max, args.silence)
+        fixed.append(args.max)
+        vad.append(t)
+        print(f"{os.path.basename(path):30s} fixe={args.max:.2f} s  vad={t:.2f} s")
+
+    if not vad:
+        print("Aucun clip.")
+        return
+
+    print("-" * 50)
+    print(f"Médiane capture fixe : {statistics.median(fixed):.2f} s")
+    print(f"Médiane capture VAD  : {statistics.median(vad):.2f} s")
+    print(f"Gain médian par tour : {statistics.median(fixed) - statistics.median(vad):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# voice_transcription/conversation.py
+# ====================================
+# Construction du prompt à préfixe stable pour la consultation PQRST
+#
+# L'historique `messages` est append-only : le prompt système reste fixe
+# en tête et chaque tour est ajouté en fin. Le rappel des questions déjà
+# posées n'entre jamais dans l'historique : il est placé en queue du
+# prompt envoyé. D'un tour à l'autre, tout le début du prompt est donc
+# identique et le serveur (cache_prompt llama.cpp, cache KV Ollama) ne
+# réévalue que les nouveaux tokens.
+
+
+def build_prompt(history, reminder, reminder_as="system", keep=None):
+    """
+    Retourne la liste de messages à envoyer au LLM sans modifier `history`.
+
+    - reminder_as="system" : rappel ajouté comme message système final
+    - reminder_as="user"   : rappel fusionné dans une copie du dernier message
+      utilisateur (modèles dont le gabarit impose l'alternance user/assistant)
+    - keep : filtre optionnel sur les messages ; il doit ne dépendre que du
+      message lui-même pour que le préfixe reste stable
+    """
+    prompt = [m for m in history if keep is None or keep(m)]
+    if not reminder:
+        return prompt
+
+    if reminder_as == "user" and prompt and prompt[-1]["role"] == "user":
+        last = prompt[-1]
+        prompt[-1] = {"role": "user", "content": f"{last['content']}\n\n({reminder})"}
+    else:
+        prompt.append({"role": "system", "content": reminder})
+    return prompt
@@ -0,0 +1,268 @@
+# voice_transcription/llm_client.py
+# ==================================
+# Client LLM unique (Ollama ou llama.cpp) :
+# - session HTTP partagée (keep-alive, pool de connexions)
+# - timeouts configurables, reprises bornées avec backoff
+# - disjoncteur : si le serveur est tombé, échec immédiat → fallback
+# - streaming : on coupe dès que la première question est complète
+# - cache de prompt côté serveur et statistiques d'évaluation du prompt
+
+import json
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BACKENDS = {
+    "ollama": "http://localhost:11434/api/chat",
+    "llamacpp": "http://localhost:8080/v1/chat/completions",
+}
+
+# Fin de la première phrase (même règle que l'ancien re.search(r'[.?\n]'))
+SENTENCE_END = re.compile(r'[.?\n]')
+
+
+class LLMUnavailable(Exception):
+    """Serveur LLM injoignable, en erreur, ou disjoncteur ouvert"""
+
+
+class CircuitBreaker:
+    """
+    Ouvert après `threshold` échecs consécutifs : les appels échouent
+    alors immédiatement pendant `cooldown` secondes, puis un essai passe.
+    """
+
+    def __init__(self, threshold=3, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                # Semi-ouvert : un seul essai, ré-ouvert s'il échoue
+                self.opened_at = None
+                self.failures = self.threshold - 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class LLMClient:
+    """
+    Client partagé par le générateur de questions et generate_summary.
+
+        llm = LLMClient(backend="llamacpp")
+        question = first_sentence(llm.stream_chat(messages, max_tokens=80))
+        summary = llm.chat(messages, max_tokens=200)
+    """
+
+    def __init__(self, backend="ollama", url=None, model="mistral",
+                 connect_timeout=2.0, read_timeout=20.0,
+                 retries=2, backoff=0.5, breaker=None,
+                 cache_prompt=True, slot_id=0, keep_alive="30m"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown LLM backend '{backend}' (available: {', '.join(BACKENDS)})")
+        self.backend = backend
+        self.url = url or BACKENDS[backend]
+        self.model = model
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.cache_prompt = cache_prompt
+        self.slot_id = slot_id
+        self.keep_alive = keep_alive
+        # Dernier appel : ttft_ms, prompt_tokens, prompt_ms, cached_tokens
+        self.last_stats = {}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    # --- Construction / lecture selon le backend ---
+
+    def _payload(self, messages, stream, params):
+        if self.backend == "ollama":
+            options = {}
+            if "temperature" in params:
+                options["temperature"] = params.pop("temperature")
+            if "max_tokens" in params:
+                options["num_predict"] = params.pop("max_tokens")
+            if "stop" in params:
+                options["stop"] = params.pop("stop")
+            payload = dict(params, model=self.model, messages=messages, stream=stream)
+            if options:
+                payload["options"] = options
+            # Garder le modèle (et son cache KV) chargé entre deux tours
+            payload.setdefault("keep_alive", self.keep_alive)
+            return payload
+
+        payload = dict(params, model=self.model, messages=messages, stream=stream)
+        if self.cache_prompt:
+            # llama.cpp : réutiliser le préfixe déjà évalué dans le même slot
+            payload.setdefault("cache_prompt", True)
+            if self.slot_id is not None:
+                payload.setdefault("id_slot", self.slot_id)
+        if stream:
+            # Statistiques dans chaque fragment : disponibles même si on coupe tôt
+            payload.setdefault("timings_per_token", True)
+        return payload
+
+    def _record_stats(self, data, stats):
+        if self.backend == "ollama":
+            if "prompt_eval_count" in data:
+                stats["prompt_tokens"] = data["prompt_eval_count"]
+            if "prompt_eval_duration" in data:
+                stats["prompt_ms"] = data["prompt_eval_duration"] / 1e6
+            return
+        timings = data.get("timings")
+        if timings:
+            stats["prompt_tokens"] = timings.get("prompt_n")
+            stats["prompt_ms"] = timings.get("prompt_ms")
+            if "cache_n" in timings:
+                stats["cached_tokens"] = timings["cache_n"]
+
+    def _content(self, data):
+        if self.backend == "ollama":
+            return data.get("message", {}).get("content", "")
+        return data["choices"][0]["message"]["content"]
+
+    def _iter_chunks(self, r, start, stats):
+        for line in r.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            if self.backend == "ollama":
+                # NDJSON : un objet par ligne
+                chunk = json.loads(line)
+                text = chunk.get("message", {}).get("content", "")
+                done = chunk.get("done")
+            else:
+                # SSE : "data: {...}" puis "data: [DONE]"
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                chunk = json.loads(data)
+                choices = chunk.get("choices") or [{}]
+                text = choices[0].get("delta", {}).get("content") or ""
+                done = False
+
+            self._record_stats(chunk, stats)
+            if text and "ttft_ms" not in stats:
+                stats["ttft_ms"] = (time.perf_counter() - start) * 1000
+            yield text
+            if done:
+                return
+
+    # --- Transport ---
+
+    def _post(self, payload, stream, timeout=None):
+        if not self.breaker.allow():
+            raise LLMUnavailable("circuit open (LLM server recently unreachable)")
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            try:
+                r = self.session.post(self.url, json=payload, stream=stream,
+                                      timeout=timeout or self.timeout)
+                if r.status_code >= 500:
+                    r.close()
+                    raise requests.HTTPError(f"{r.status_code} server error", response=r)
+                r.raise_for_status()
+                self.breaker.record_success()
+                return r
+            except requests.ConnectionError as e:
+                last_error = e
+                # Serveur arrêté : inutile d'insister, on ouvre le disjoncteur
+                self.breaker.record_failure()
+                if not self.breaker.allow():
+                    break
+            except requests.HTTPError as e:
+                last_error = e
+                if e.response is not None and e.response.status_code < 500:
+                    # Requête invalide : le serveur est vivant, pas de reprise
+                    break
+                self.breaker.record_failure()
+            except requests.Timeout as e:
+                last_error = e
+                self.breaker.record_failure()
+            except requests.RequestException as e:
+                # URL invalide, réponse tronquée... : pas de reprise, mais
+                # l'appelant bascule sur son fallback comme pour une panne
+                last_error = e
+                break
+            if attempt < self.retries:
+                time.sleep(self.backoff * (2 ** attempt))
+
+        raise LLMUnavailable(str(last_error))
+
+    def chat(self, messages, timeout=None, **params) -> str:
+        """Réponse complète (non streamée)"""
+        self.last_stats = {}
+        r = self._post(self._payload(messages, False, params), stream=False, timeout=timeout)
+        try:
+            data = r.json()
+            self._record_stats(data, self.last_stats)
+            return self._content(data).strip()
+        except (ValueError, KeyError, IndexError) as e:
+            raise LLMUnavailable(f"malformed response: {e}")
+
+    def stream_chat(self, messages, timeout=None, **params):
+        """
+        Itère sur les fragments de texte au fil de la génération.
+
+        Fermer le générateur ferme aussitôt la connexion : le serveur
+        arrête de générer et libère son slot. Ollama n'envoie
+        prompt_eval_count / prompt_eval_duration que dans le fragment
+        final ("done") : après une coupure anticipée, ces champs sont
+        absents de last_stats (indisponibles pour ce tour, pas nuls).
+        """
+        stats = self.last_stats = {}
+        start = time.perf_counter()
+        r = None
+        try:
+            r = self._post(self._payload(messages, True, params), stream=True, timeout=timeout)
+            yield from self._iter_chunks(r, start, stats)
+        except (requests.RequestException, ValueError) as e:
+            raise LLMUnavailable(str(e))
+        finally:
+            if r is not None:
+                r.close()
+
+
+def first_sentence(chunks):
+    """
+    Accumule les fragments jusqu'à la première fin de phrase puis ferme
+    le flux : la connexion est libérée et le serveur arrête de générer.
+    """
+    text = ""
+    try:
+        for chunk in chunks:
+            text += chunk
+            # Ignorer les retours à la ligne de tête avant tout contenu
+            match = SENTENCE_END.search(text, len(text) - len(text.lstrip()))
+            if match:
+                return text[:match.end()].strip()
+        return text.strip()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
@@ -0,0 +1,57 @@
+# voice_transcription/startup.py
+# ===============================
+# Chargement différé des moteurs (ASR, LLM) sur un thread de fond
+
+import threading
+import time
+
+
+class StartupManager:
+    """
+    Exécute les étapes de démarrage coûteuses en arrière-plan pendant
+    que l'interface est déjà affichée, et mesure chacune d'elles.
+
+        startup = StartupManager(on_ready=enable_ui)
+        startup.add("asr_load", load_asr)
+        startup.start()
+    """
+
+    def __init__(self, on_ready=None, on_error=None):
+        self.t0 = time.perf_counter()
+        self.steps = []
+        self.timings = {}
+        self.errors = {}
+        self.ready = threading.Event()
+        self.on_ready = on_ready
+        self.on_error = on_error
+
+    def add(self, name, fn, required=True):
+        self.steps.append((name, fn, required))
+
+    def mark(self, name):
+        """Horodate un jalon (s depuis la création du manager)"""
+        self.timings[name] = time.perf_counter() - self.t0
+        print(f"[STARTUP] {name}: {self.timings[name]:.2f} s")
+
+    def _run(self):
+        for name, fn, required in self.steps:
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                self.errors[name] = e
+                print(f"[STARTUP] {name} failed: {e}")
+                if required:
+                    if self.on_error:
+                        self.on_error(name, e)
+                    return
+            self.timings[name] = time.perf_counter() - start
+            print(f"[STARTUP] {name}: {self.timings[name]:.2f} s")
+
+        self.mark("engines_ready")
+        self.ready.set()
+        if self.on_ready:
+            self.on_ready()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
@@ -1,28 +1,39 @@
 import tkinter as tk
 import tkinter.font as tkFont
 import sounddevice as sd
-import whisper
-import requests
 import threading
 import numpy as np
-import soundfile as sf
 import noisereduce as nr
 import re
 import sys
-from gtts import gTTS
 import pygame
+from audio_capture import archive_wav_async, record_utterance
+from asr_engine import load_engine
+from llm_client import LLMClient, LLMUnavailable, first_sentence
+from conversation import build_prompt
+from tts import SpeechPlayer, load_tts_engine
 import os
-import tempfile
+import statistics
 import time # Ajout pour la mesure de la latence
 
 # --- CONFIG ---
 RATE = 16000
 MAX_QUESTIONS = 6
+STREAMING_CAPTURE = True   # False : ancienne capture fixe (sd.rec de 8 s)
+TRAILING_SILENCE = 0.8     # Silence (s) qui termine la réponse du patient
+ARCHIVE_AUDIO = False      # True : archive chaque réponse en WAV (thread séparé)
+TTS_IDLE_TIMEOUT = 30.0    # Attente max (s) de la fin de la voix avant d'enregistrer
 
 # Initialisation
 pygame.mixer.init()
-# Chargez votre modèle Whisper (attention à la latence du modèle "medium")
-model = whisper.load_model("medium")
+# TTS hors ligne (TTS_ENGINE) avec cache audio persistant (TTS_CACHE_DIR)
+tts = SpeechPlayer(load_tts_engine())
+# Moteur ASR choisi par déploiement (attention à la latence du modèle "medium") :
+# ASR_BACKEND=faster-whisper ASR_MODEL=small → int8 CTranslate2 sur CPU
+model = load_engine()
+# Client LLM partagé (session keep-alive, reprises, disjoncteur)
+llm = LLMClient(backend=os.environ.get("LLM_BACKEND", "llamacpp"),
+                model=os.environ.get("LLM_MODEL", "mistral-7b-instruct-v0.2"))  # peut être ignoré par llama.cpp
 
 # --- SYSTEM PROMPT ---
 SYSTEM_PROMPT = """You are a clinical interviewer strictly following the PQRST framework:
@@ -47,11 +58,12 @@ patient_data = {k: None for k in ["name", "age", "marital_status", "children", "
 conversation_phase = "personal_info"
 question_counter = 0
 medical_questions_asked = set()
-is_speaking = False
 
 # --- NOUVELLE SECTION: METRIQUES D'ÉVALUATION AVEC ASR ET LLM ---
 evaluation_metrics = {
     "latencies": [],
+    "capture_latencies": [],  # ⬅️ Durée d'enregistrement (VAD vs 8 s fixes)
+    "prompt_evals": [],       # ⬅️ Tokens / temps d'évaluation du prompt par tour
     "asr_latencies": [],      # ⬅️ Nouvelle métrique pour Whisper
     "llm_latencies": [],      # ⬅️ Nouvelle métrique pour LLM
     "llm_questions_valid": 0,
@@ -62,41 +74,31 @@ evaluation_metrics = {
 
 # --- TTS ---
 def speak_text(text):
-    global is_speaking
+    """Non bloquant : la phrase est mise en file (synthèse puis lecture en mémoire)"""
     clean_text = re.sub(r'[🎤📄✅🛑🩺●]', '', text).strip()
     if not clean_text or "[SUMMARY_REQUESTED]" in text:
         return
-    
-    try:
-        is_speaking = True
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-            temp_file = fp.name
-        
-        gTTS(text=clean_text, lang='en', slow=False).save(temp_file)
-        pygame.mixer.music.load(temp_file)
-        pygame.mixer.music.play()
-        
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-        
-        pygame.mixer.music.unload()
-        try: os.remove(temp_file)
-        except: pass
-    except Exception as e:
-        print(f"TTS Error: {e}")
-    finally:
-        is_speaking = False
+    tts.say(clean_text)
 
 # --- AUDIO ---
 def record_audio(duration=8):
+    """Retourne la réponse du patient en float32 mono, sans passer par le disque (None si rien capté)"""
     print("🎤 Recording...")
-    audio = sd.rec(int(duration * RATE), samplerate=RATE, channels=1)
-    sd.wait()
-    audio = nr.reduce_noise(y=audio.flatten().astype(np.float32), sr=RATE)
-    filename = "patient.wav"
-    sf.write(filename, audio, RATE)
-    print("✅ Audio saved")
-    return filename
+    if STREAMING_CAPTURE:
+        # S'arrête dès que le patient se tait (duration = longueur maximale)
+        audio = record_utterance(max_duration=duration, trailing_silence=TRAILING_SILENCE)
+        if audio is None:
+            print("⚠️ No audio captured")
+            return None
+    else:
+        audio = sd.rec(int(duration * RATE), samplerate=RATE, channels=1, dtype="float32")
+        sd.wait()
+        audio = audio.reshape(-1)
+    audio = np.asarray(nr.reduce_noise(y=audio, sr=RATE), dtype=np.float32)
+    if ARCHIVE_AUDIO:
+        archive_wav_async(audio)
+    print("✅ Audio captured")
+    return audio
 
 # --- EXTRACTION (non modifié) ---
 def extract_numbers(text):
@@ -205,6 +207,14 @@ PQRST_FALLBACK = [
     "Does anything help relieve the symptoms?"
 ]
 
+INITIAL_MSG = "Hello! Could you please tell me your full name for my records?"
+CLOSING_MSG = "Consultation complete! Your medical report has been saved."
+
+# Phrases fixes : synthétisées une fois, puis jouées depuis la mémoire
+CACHED_PHRASES = [INITIAL_MSG, CLOSING_MSG, "How are you feeling today?"] + \
+    list(PERSONAL_QUESTIONS.values()) + PQRST_FALLBACK
+tts.preload(CACHED_PHRASES)  # En tâche de fond, après les phrases à dire
+
 def validate_question(response):
     """Valide si la question est complète et bien formée"""
     words = response.split()
@@ -219,6 +229,22 @@ def validate_question(response):
     
     return not any(re.search(p, response.lower()) for p in bad_patterns)
 
+def _record_prompt_eval(stats):
+    evaluation_metrics["prompt_evals"].append(stats)
+
+    def fmt(key, unit):
+        # Champ absent : statistique indisponible (pas 0)
+        return f"{stats[key]:.0f} {unit}" if stats.get(key) is not None else f"n/a {unit}"
+
+    print(f"Prompt eval: {fmt('prompt_tokens', 'tokens')}, {fmt('prompt_ms', 'ms')} "
+          f"(TTFT {fmt('ttft_ms', 'ms')})")
+
+def report_prompt_eval():
+    """Tokens de prompt réellement évalués par le serveur pour ce tour"""
+    # Ollama : statistiques seulement dans le dernier fragment, jamais lu
+    # quand le flux est coupé tôt → affichées "n/a" pour ce tour
+    _record_prompt_eval(dict(llm.last_stats))
+
 def generate_medical_question(messages):
     global medical_questions_asked, question_counter
 
@@ -227,36 +253,26 @@ def generate_medical_question(messages):
         if content and content != "[SUMMARY_REQUESTED]":
             medical_questions_asked.add(content)
 
-    # Filtrer les messages utiles
-    filtered = [m for m in messages if m["role"] in ("system", "user", "assistant")]
-
-    # Ajouter un rappel des questions déjà posées (optionnel mais utile)
+    # Préfixe stable : le prompt système reste fixe en tête et l'historique
+    # est append-only ; le rappel des questions posées va en queue (fusionné
+    # au dernier message patient pour respecter l'alternance du gabarit
+    # Mistral). llama.cpp ne réévalue ainsi que les nouveaux tokens.
+    history_note = ""
     if medical_questions_asked:
-        history_note = "Already asked: " + "; ".join(medical_questions_asked) + "\n"
-        # Injecter dans le dernier message système ou en créer un
-        if filtered and filtered[0]["role"] == "system":
-            filtered[0]["content"] = SYSTEM_PROMPT + "\n\n" + history_note
-        else:
-            filtered.insert(0, {"role": "system", "content": SYSTEM_PROMPT + "\n\n" + history_note})
-    else:
-        if not (filtered and filtered[0]["role"] == "system"):
-            filtered.insert(0, {"role": "system", "content": SYSTEM_PROMPT})
+        history_note = "Already asked: " + "; ".join(medical_questions_asked)
+    filtered = build_prompt(messages, history_note, reminder_as="user",
+                            keep=lambda m: m["role"] in ("system", "user", "assistant"))
 
     try:
-        # Appel à llama.cpp (API OpenAI-compatible)
-        response = requests.post(
-            "http://localhost:8080/v1/chat/completions",
-            json={
-                "model": "mistral-7b-instruct-v0.2",  # peut être ignoré par llama.cpp
-                "messages": filtered,
-                "temperature": 0.3,        # Réduit l'aléatoire → moins d'hallucinations
-                "max_tokens": 80,          # Limite la réponse à une question courte
-                "stop": ["\n", "."]        # Force l'arrêt après une phrase
-            },
-            timeout=20  # Important pour éviter les freezes
-        )
-        response.raise_for_status()
-        llm_response = response.json()["choices"][0]["message"]["content"].strip()
+        # Appel à llama.cpp (API OpenAI-compatible) en streaming :
+        # le flux est coupé dès que la première question est complète
+        llm_response = first_sentence(llm.stream_chat(
+            filtered,
+            temperature=0.3,        # Réduit l'aléatoire → moins d'hallucinations
+            max_tokens=80,          # Limite la réponse à une question courte
+            stop=["\n", "."]       # Force l'arrêt après une phrase
+        ))
+        report_prompt_eval()
 
         # Nettoyage
         llm_response = re.sub(r"^(Doctor:|Interviewer:)\s*", "", llm_response, flags=re.I)
@@ -275,7 +291,7 @@ def generate_medical_question(messages):
             evaluation_metrics["llm_questions_fallback"] += 1
             return PQRST_FALLBACK[question_counter % len(PQRST_FALLBACK)]
 
-    except Exception as e:
+    except LLMUnavailable as e:
         print(f"⚠️ LLM Error: {e}")
         evaluation_metrics["llm_questions_fallback"] += 1
         return PQRST_FALLBACK[question_counter % len(PQRST_FALLBACK)]
@@ -284,8 +300,9 @@ def generate_medical_question(messages):
 def process_audio_thread():
     global conversation_phase, question_counter
     
-    while is_speaking:
-        root.after(100)
+    # Ne pas enregistrer la voix de l'assistant (borné : jamais de blocage définitif)
+    if not tts.wait_idle(TTS_IDLE_TIMEOUT):
+        print("⚠️ TTS still busy, recording anyway")
     
     record_button.config(text="● Recording...", bg="#d9534f", state="disabled")
     report_button.config(state="disabled")
@@ -296,14 +313,20 @@ def process_audio_thread():
     start_time_total = time.time() 
     # ----------------------------------------------------
     
-    filename = record_audio()
+    audio = record_audio()
+    if audio is None:
+        # Rien à transcrire : on rend la main au patient
+        record_button.config(text="🎤 Speak", bg="#0275d8", state="normal")
+        report_button.config(state="normal")
+        return
+    evaluation_metrics["capture_latencies"].append(time.time() - start_time_total)
     
     # ----------------------------------------------------
     # 1. DÉBUT DU CHRONOMÉTRAGE ASR (Whisper)
     start_time_asr = time.time()
     # ----------------------------------------------------
     
-    patient_text = model.transcribe(filename, language="en")["text"].strip()
+    patient_text = model.transcribe(audio, language="en")["text"].strip()
     
     # ----------------------------------------------------
     # 1. FIN DU CHRONOMÉTRAGE ASR
@@ -355,9 +378,7 @@ def process_audio_thread():
         response_label.config(
             text="✅ Consultation complete!\n"
         )
-        threading.Thread(target=speak_text, args=(
-            "Consultation complete! Your medical report has been saved.",
-        ), daemon=True).start()
+        speak_text(CLOSING_MSG)
         record_button.config(text="✅ FINISHED", bg="#28a745", state="disabled")
         report_button.config(state="disabled")
         return
@@ -365,7 +386,7 @@ def process_audio_thread():
     print(f"Doctor: {doctor_text}")
     response_label.config(text=doctor_text)
     messages.append({"role": "assistant", "content": doctor_text})
-    threading.Thread(target=speak_text, args=(doctor_text,), daemon=True).start()
+    speak_text(doctor_text)
     
     record_button.config(text="🎤 Speak", bg="#0275d8", state="normal")
     report_button.config(state="normal")
@@ -385,21 +406,15 @@ def generate_summary():
 
     # Générer le résumé clinique
     try:
-        response = requests.post(
-            "http://localhost:8080/v1/chat/completions",
-            json={
-                "model": "mistral-7b-instruct-v0.2.Q4_K_M.gguf",
-                "messages": [
-                    {"role": "system", "content": "Generate a structured PQRST medical summary in English using exactly 3 numbered points:\n1) Chief complaint and Quality\n2) Region/Radiation and Severity\n3) Timing and Modifying factors\nBe concise. No extra text."},
-                    {"role": "user", "content": conversation}
-                ],
-                "temperature": 0.2,
-                "max_tokens": 200
-            },
-            timeout=20
+        clinical_summary = llm.chat(
+            [
+                {"role": "system", "content": "Generate a structured PQRST medical summary in English using exactly 3 numbered points:\n1) Chief complaint and Quality\n2) Region/Radiation and Severity\n3) Timing and Modifying factors\nBe concise. No extra text."},
+                {"role": "user", "content": conversation}
+            ],
+            temperature=0.2,
+            max_tokens=200
         )
-        clinical_summary = response.json()["choices"][0]["message"]["content"].strip()
-    except Exception as e:
+    except LLMUnavailable as e:
         print(f"Summary generation error: {e}")
         clinical_summary = "Error generating clinical summary."
 
@@ -425,6 +440,14 @@ def display_evaluation():
     # Calcul des moyennes totales (Ancienne métrique)
     num_latencies = len(evaluation_metrics["latencies"])
     avg_latency = sum(evaluation_metrics["latencies"]) / num_latencies if num_latencies > 0 else 0
+    median_latency = statistics.median(evaluation_metrics["latencies"]) if num_latencies > 0 else 0
+    num_capture = len(evaluation_metrics["capture_latencies"])
+    median_capture = statistics.median(evaluation_metrics["capture_latencies"]) if num_capture > 0 else 0
+    prompt_tokens = [e["prompt_tokens"] for e in evaluation_metrics["prompt_evals"] if e.get("prompt_tokens") is not None]
+    prompt_ms = [e["prompt_ms"] for e in evaluation_metrics["prompt_evals"] if e.get("prompt_ms") is not None]
+    avg_prompt_tokens = f"{sum(prompt_tokens) / len(prompt_tokens):.0f} tokens" if prompt_tokens else "n/a tokens"
+    avg_prompt_ms = f"{sum(prompt_ms) / len(prompt_ms):.0f} ms" if prompt_ms else "n/a ms"
+    median_tts_start = statistics.median(tts.start_latencies) if tts.start_latencies else 0
     
     # ⬅️ NOUVEAUX CALCULS DE MOYENNE
     num_asr = len(evaluation_metrics["asr_latencies"])
@@ -450,11 +473,15 @@ def display_evaluation():
         
         f.write("### 1. PERFORMANCE TECHNIQUE ###\n")
         f.write(f"• Latence Moyenne (temps de réponse complet) : **{avg_latency:.2f} s**\n")
+        f.write(f"• Latence Médiane (temps de réponse complet) : **{median_latency:.2f} s**\n")
+        f.write(f"• Durée Médiane d'enregistrement ({'VAD' if STREAMING_CAPTURE else 'fixe'}) : **{median_capture:.2f} s**\n")
         # ⬅️ NOUVEAUX AFFICHAGES
-        f.write(f"• Latence Moyenne ASR (Whisper) : **{avg_asr_latency:.2f} s**\n")
-        f.write(f"• Latence Moyenne LLM (Mistral) : **{avg_llm_latency:.2f} s**\n")
+        f.write(f"• Latence Moyenne ASR ({model.name} {model.model_size}) : **{avg_asr_latency:.2f} s**\n")
+        f.write(f"• Latence Moyenne LLM (Mistral, 1re question) : **{avg_llm_latency:.2f} s**\n")
         # -------------------
         f.write(f"• Nombre total d'interactions chronométrées : {num_latencies}\n")
+        f.write(f"• Démarrage de la voix (médiane) : {median_tts_start * 1000:.0f} ms ({tts.engine.name})\n")
+        f.write(f"• Évaluation du prompt LLM par tour : {avg_prompt_tokens}, {avg_prompt_ms} (moyenne)\n")
         f.write("\n" + "-"*50 + "\n")
 
         f.write("### 2. EFFICACITÉ DU DIALOGUE ###\n")
@@ -507,8 +534,7 @@ response_label = tk.Label(frame, text="", bg="white", fg="#333", wraplength=480,
                              justify="left", font=("Arial", 12), anchor="nw")
 response_label.pack(padx=10, pady=10, fill="both", expand=True)
 
-initial_msg = "Hello! Could you please tell me your full name for my records?"
-response_label.config(text=initial_msg)
-threading.Thread(target=speak_text, args=(initial_msg,), daemon=True).start()
+response_label.config(text=INITIAL_MSG)
+speak_text(INITIAL_MSG)
 
 root.mainloop()
\ No newline at end of file
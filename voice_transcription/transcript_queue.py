@@ -0,0 +1,96 @@
+# voice_transcription/transcript_queue.py
+# ========================================
+# File bornée des transcriptions, un producteur (thread voix) et un
+# consommateur (main_loop, interface...).
+#
+# Anneau de cases préallouées : le producteur n'écrit que `_tail`, le
+# consommateur que `_head` ; aucune des deux positions n'est partagée en
+# écriture, donc pas de verrou sur le chemin des données. Seul le réveil
+# d'un consommateur bloqué passe par un threading.Event.
+#
+#   queue = TranscriptQueue(64)
+#   queue.put(Transcript("j'ai soif", 0.92, onset))     # thread voix
+#   transcript = queue.get(timeout=0.5)                  # consommateur
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass(frozen=True, slots=True)
+class Transcript:
+    text: str
+    confidence: float
+    onset: float                                            # début de la parole (time.monotonic)
+    monotonic: float = field(default_factory=time.monotonic)  # fin de la transcription
+    timestamp: float = field(default_factory=time.time)      # fin de la transcription (horloge murale)
+
+
+class TranscriptQueue:
+    """
+    Ordre d'arrivée garanti. File pleine : la nouvelle transcription est
+    refusée (put → False) et comptée dans `dropped` ; `max_depth` garde
+    la profondeur maximale atteinte pour dimensionner la capacité.
+    """
+
+    def __init__(self, capacity=64):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._head = 0                  # prochaine lecture (consommateur seulement)
+        self._tail = 0                  # prochaine écriture (producteur seulement)
+        self._ready = threading.Event()
+        self.pushed = 0
+        self.popped = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return self._tail - self._head
+
+    def put(self, transcript: Transcript) -> bool:
+        depth = self._tail - self._head
+        if depth >= self.capacity:
+            self.dropped += 1
+            return False
+        self._slots[self._tail % self.capacity] = transcript
+        # La case est écrite avant d'être publiée par l'avance de _tail
+        self._tail += 1
+        self.pushed += 1
+        self.max_depth = max(self.max_depth, depth + 1)
+        self._ready.set()
+        return True
+
+    def get_nowait(self) -> Optional[Transcript]:
+        if self._head == self._tail:
+            return None
+        i = self._head % self.capacity
+        transcript = self._slots[i]
+        self._slots[i] = None
+        self._head += 1
+        self.popped += 1
+        return transcript
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Transcript]:
+        """Prochaine transcription, en attendant au plus `timeout` s (None : sans limite)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            transcript = self.get_nowait()
+            if transcript is not None:
+                return transcript
+            self._ready.clear()
+            # Re-vérification après clear : un put entre les deux ne doit pas être manqué
+            transcript = self.get_nowait()
+            if transcript is not None:
+                return transcript
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if not self._ready.wait(remaining):
+                return None
+
+    def stats(self):
+        return {"depth": len(self), "capacity": self.capacity, "pushed": self.pushed,
+                "popped": self.popped, "dropped": self.dropped, "max_depth": self.max_depth}
@@ -0,0 +1,244 @@
+# voice_transcription/tts.py
+# ===========================
+# Synthèse vocale : moteurs interchangeables (hors ligne par défaut),
+# cache persistant adressé par contenu, et file de lecture en mémoire.
+#
+# La synthèse et la lecture tournent sur deux threads distincts : la
+# phrase suivante est synthétisée pendant que la précédente est jouée,
+# et une phrase déjà en cache démarre sans attendre le moteur.
+
+import hashlib
+import io
+import itertools
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+
+import pygame
+
+TTS_ENGINE = os.environ.get("TTS_ENGINE", "pyttsx3")   # pyttsx3 / espeak / piper / gtts
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", "tts_cache")
+
+# Priorités : une phrase à dire passe toujours avant le préchargement
+PRIORITY_SAY = 0
+PRIORITY_PRELOAD = 1
+
+
+class Pyttsx3Engine:
+    """SAPI5 / NSSpeechSynthesizer / espeak via pyttsx3 (hors ligne)"""
+
+    name = "pyttsx3"
+    ext = "wav"
+
+    def __init__(self, rate=160, voice=None):
+        self.rate = rate
+        self.voice = voice
+        self._engine = None
+
+    @property
+    def id(self):
+        return f"{self.name}:{self.voice}:{self.rate}"
+
+    def synthesize(self, text) -> bytes:
+        # pyttsx3 doit rester sur un seul thread : le thread de synthèse
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+            self._engine.setProperty("rate", self.rate)
+            if self.voice:
+                self._engine.setProperty("voice", self.voice)
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self._engine.save_to_file(text, path)
+            self._engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+class EspeakEngine:
+    """espeak-ng en sous-processus, WAV sur stdout (hors ligne)"""
+
+    name = "espeak"
+    ext = "wav"
+
+    def __init__(self, voice="en", speed=150):
+        self.voice = voice
+        self.speed = speed
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak") or "espeak-ng"
+
+    @property
+    def id(self):
+        return f"{self.name}:{self.voice}:{self.speed}"
+
+    def synthesize(self, text) -> bytes:
+        return subprocess.run([self.binary, "--stdout", "-v", self.voice, "-s", str(self.speed), text],
+                              check=True, capture_output=True).stdout
+
+
+class PiperEngine:
+    """Piper (voix neuronales ONNX, hors ligne), PCM brut encapsulé en WAV"""
+
+    name = "piper"
+    ext = "wav"
+
+    def __init__(self, model=os.environ.get("PIPER_MODEL", "en_US-lessac-medium.onnx"), sample_rate=22050):
+        self.model = model
+        self.sample_rate = sample_rate
+
+    @property
+    def id(self):
+        return f"{self.name}:{os.path.basename(self.model)}"
+
+    def synthesize(self, text) -> bytes:
+        pcm = subprocess.run(["piper", "--model", self.model, "--output-raw"],
+                             input=text.encode("utf-8"), check=True, capture_output=True).stdout
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(pcm)
+        return buf.getvalue()
+
+
+class GTTSEngine:
+    """Google TTS (réseau requis) : ancien comportement"""
+
+    name = "gtts"
+    ext = "mp3"
+
+    def __init__(self, lang="en"):
+        self.lang = lang
+
+    @property
+    def id(self):
+        return f"{self.name}:{self.lang}"
+
+    def synthesize(self, text) -> bytes:
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text=text, lang=self.lang, slow=False).write_to_fp(buf)
+        return buf.getvalue()
+
+
+ENGINES = {
+    Pyttsx3Engine.name: Pyttsx3Engine,
+    EspeakEngine.name: EspeakEngine,
+    PiperEngine.name: PiperEngine,
+    GTTSEngine.name: GTTSEngine,
+}
+
+
+def load_tts_engine(name=None, **kwargs):
+    name = name or TTS_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown TTS engine '{name}' (available: {', '.join(ENGINES)})")
+    return ENGINES[name](**kwargs)
+
+
+class SpeechPlayer:
+    """
+    File de synthèse + file de lecture.
+
+        tts = SpeechPlayer(load_tts_engine())
+        tts.preload(PQRST_FALLBACK)      # en tâche de fond
+        tts.say("How are you feeling today?")
+        tts.wait_idle()                  # remplace l'attente active sur is_speaking
+    """
+
+    def __init__(self, engine, cache_dir=TTS_CACHE_DIR):
+        self.engine = engine
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._sounds = {}               # clé → pygame.mixer.Sound en mémoire
+        self._synth_queue = queue.PriorityQueue()
+        self._play_queue = queue.Queue()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self.start_latencies = []       # s entre say() et le début de la lecture
+
+        threading.Thread(target=self._synth_loop, daemon=True).start()
+        threading.Thread(target=self._play_loop, daemon=True).start()
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.engine.id}|{text}".encode("utf-8")).hexdigest()
+
+    def _sound(self, text):
+        key = self.key(text)
+        sound = self._sounds.get(key)
+        if sound is not None:
+            return sound
+
+        path = os.path.join(self.cache_dir, f"{key}.{self.engine.ext}")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+        else:
+            data = self.engine.synthesize(text)
+            # Écriture atomique : un autre processus peut lire le même cache
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+        sound = pygame.mixer.Sound(file=io.BytesIO(data))
+        self._sounds[key] = sound
+        return sound
+
+    def _synth_loop(self):
+        while True:
+            _, _, text, requested_at = self._synth_queue.get()
+            try:
+                sound = self._sound(text)
+            except Exception as e:
+                print(f"TTS Error: {e}")
+                sound = None
+            if requested_at is not None:
+                self._play_queue.put((sound, requested_at))
+
+    def _play_loop(self):
+        while True:
+            sound, requested_at = self._play_queue.get()
+            try:
+                if sound is not None:
+                    sound.play()
+                    self.start_latencies.append(time.perf_counter() - requested_at)
+                    # Durée connue : pas d'attente active sur get_busy()
+                    time.sleep(sound.get_length())
+            except Exception as e:
+                # Mixer / périphérique en erreur : on saute la phrase, le thread survit
+                print(f"TTS playback error: {e}")
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    if self._pending == 0:
+                        self._idle.set()
+
+    def preload(self, texts):
+        """Synthétise (ou relit du disque) et garde en mémoire, sans jouer"""
+        for text in texts:
+            self._synth_queue.put((PRIORITY_PRELOAD, next(self._order), text, None))
+
+    def say(self, text):
+        with self._lock:
+            self._pending += 1
+            self._idle.clear()
+        self._synth_queue.put((PRIORITY_SAY, next(self._order), text, time.perf_counter()))
+
+    def is_speaking(self) -> bool:
+        return not self._idle.is_set()
+
+    def wait_idle(self, timeout=None) -> bool:
+        return self._idle.wait(timeout)
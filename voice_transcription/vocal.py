@@ -1,26 +1,39 @@
 import tkinter as tk
 import tkinter.font as tkFont
 import sounddevice as sd
-import whisper
-import requests
 import threading
 import numpy as np
-import soundfile as sf
 import noisereduce as nr
 import re
 import sys
-from gtts import gTTS
 import pygame
+from audio_capture import archive_wav_async, record_utterance
+from asr_engine import load_engine
+from startup import StartupManager
+from llm_client import LLMClient, LLMUnavailable, first_sentence
+from conversation import build_prompt
+from tts import SpeechPlayer, load_tts_engine
 import os
-import tempfile
+import statistics
 import time # Ajout pour la mesure de la latence
 
 # --- CONFIG ---
 RATE = 16000
 MAX_QUESTIONS = 6
+STREAMING_CAPTURE = True   # False : ancienne capture fixe (sd.rec de 8 s)
+TRAILING_SILENCE = 0.8     # Silence (s) qui termine la réponse du patient
+ARCHIVE_AUDIO = False      # True : archive chaque réponse en WAV (thread séparé)
+TTS_IDLE_TIMEOUT = 30.0    # Attente max (s) de la fin de la voix avant d'enregistrer
 
+# Les moteurs sont chargés en arrière-plan une fois l'UI affichée (voir STARTUP)
+startup = StartupManager()
 pygame.mixer.init()
-model = whisper.load_model("medium")
+# TTS hors ligne (TTS_ENGINE) avec cache audio persistant (TTS_CACHE_DIR)
+tts = SpeechPlayer(load_tts_engine())
+model = None
+# Client LLM partagé (session keep-alive, reprises, disjoncteur)
+llm = LLMClient(backend=os.environ.get("LLM_BACKEND", "ollama"),
+                model=os.environ.get("LLM_MODEL", "mistral"))
 
 # --- SYSTEM PROMPT ---
 SYSTEM_PROMPT = """You are a doctor using PQRST method (Provocation, Quality, Region, Severity, Timing).
@@ -43,11 +56,12 @@ patient_data = {k: None for k in ["name", "age", "marital_status", "children", "
 conversation_phase = "personal_info"
 question_counter = 0
 medical_questions_asked = set()
-is_speaking = False
 
 # --- NOUVELLE SECTION: METRIQUES D'ÉVALUATION ---
 evaluation_metrics = {
     "latencies": [],
+    "capture_latencies": [],  # ⬅️ Durée d'enregistrement (VAD vs 8 s fixes)
+    "prompt_evals": [],       # ⬅️ Tokens / temps d'évaluation du prompt par tour
     "llm_questions_valid": 0,
     "llm_questions_fallback": 0
 }
@@ -56,41 +70,31 @@ evaluation_metrics = {
 
 # --- TTS ---
 def speak_text(text):
-    global is_speaking
+    """Non bloquant : la phrase est mise en file (synthèse puis lecture en mémoire)"""
     clean_text = re.sub(r'[🎤📄✅🛑🩺●]', '', text).strip()
     if not clean_text or "[SUMMARY_REQUESTED]" in text:
         return
-    
-    try:
-        is_speaking = True
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-            temp_file = fp.name
-        
-        gTTS(text=clean_text, lang='en', slow=False).save(temp_file)
-        pygame.mixer.music.load(temp_file)
-        pygame.mixer.music.play()
-        
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-        
-        pygame.mixer.music.unload()
-        try: os.remove(temp_file)
-        except: pass
-    except Exception as e:
-        print(f"TTS Error: {e}")
-    finally:
-        is_speaking = False
+    tts.say(clean_text)
 
 # --- AUDIO ---
 def record_audio(duration=8):
+    """Retourne la réponse du patient en float32 mono, sans passer par le disque (None si rien capté)"""
     print("🎤 Recording...")
-    audio = sd.rec(int(duration * RATE), samplerate=RATE, channels=1)
-    sd.wait()
-    audio = nr.reduce_noise(y=audio.flatten().astype(np.float32), sr=RATE)
-    filename = "patient.wav"
-    sf.write(filename, audio, RATE)
-    print("✅ Audio saved")
-    return filename
+    if STREAMING_CAPTURE:
+        # S'arrête dès que le patient se tait (duration = longueur maximale)
+        audio = record_utterance(max_duration=duration, trailing_silence=TRAILING_SILENCE)
+        if audio is None:
+            print("⚠️ No audio captured")
+            return None
+    else:
+        audio = sd.rec(int(duration * RATE), samplerate=RATE, channels=1, dtype="float32")
+        sd.wait()
+        audio = audio.reshape(-1)
+    audio = np.asarray(nr.reduce_noise(y=audio, sr=RATE), dtype=np.float32)
+    if ARCHIVE_AUDIO:
+        archive_wav_async(audio)
+    print("✅ Audio captured")
+    return audio
 
 # --- EXTRACTION ---
 def extract_numbers(text):
@@ -203,6 +207,14 @@ PQRST_FALLBACK = [
     "Does anything help relieve the symptoms?"
 ]
 
+INITIAL_MSG = "Hello! Could you please tell me your full name for my records?"
+CLOSING_MSG = "Consultation complete! Your report is being sent to your doctor. Wishing you a speedy recovery!"
+
+# Phrases fixes : synthétisées une fois, puis jouées depuis la mémoire
+CACHED_PHRASES = [INITIAL_MSG, CLOSING_MSG, "How are you feeling today?"] + \
+    list(PERSONAL_QUESTIONS.values()) + PQRST_FALLBACK
+tts.preload(CACHED_PHRASES)  # En tâche de fond, après les phrases à dire
+
 def validate_question(response):
     """Valide si la question est complète et bien formée"""
     words = response.split()
@@ -217,33 +229,48 @@ def validate_question(response):
     
     return not any(re.search(p, response.lower()) for p in bad_patterns)
 
+def _record_prompt_eval(stats):
+    evaluation_metrics["prompt_evals"].append(stats)
+
+    def fmt(key, unit):
+        # Champ absent : statistique indisponible (pas 0)
+        return f"{stats[key]:.0f} {unit}" if stats.get(key) is not None else f"n/a {unit}"
+
+    print(f"Prompt eval: {fmt('prompt_tokens', 'tokens')}, {fmt('prompt_ms', 'ms')} "
+          f"(TTFT {fmt('ttft_ms', 'ms')})")
+
+def report_prompt_eval():
+    """Tokens de prompt réellement évalués par le serveur pour ce tour"""
+    # Ollama : statistiques seulement dans le dernier fragment, jamais lu
+    # quand le flux est coupé tôt → affichées "n/a" pour ce tour
+    _record_prompt_eval(dict(llm.last_stats))
+
 def generate_medical_question(messages):
     global medical_questions_asked, question_counter
     
     if messages and messages[-1]["role"] == "assistant":
         medical_questions_asked.add(messages[-1]["content"].strip())
     
-    filtered = [m for m in messages if m["role"] == "system" or m["role"] == "user" or 
-                (m["role"] == "assistant" and ('?' in m["content"] or '[SUMMARY]' in m["content"]))]
-    
-    temp_messages = filtered + [{
-        "role": "system",
-        "content": f"Questions asked: {list(medical_questions_asked)}\n\n"
-                     "Ask a NEW complete question about PQRST. "
-                     "If you have enough info, respond with [SUMMARY]."
-    }]
+    # Préfixe stable (système fixe + historique append-only) : seul le rappel
+    # en queue et le dernier tour sont nouveaux pour le cache du serveur
+    temp_messages = build_prompt(
+        messages,
+        f"Questions asked: {list(medical_questions_asked)}\n\n"
+        "Ask a NEW complete question about PQRST. "
+        "If you have enough info, respond with [SUMMARY].",
+        keep=lambda m: m["role"] == "system" or m["role"] == "user" or
+                       (m["role"] == "assistant" and ('?' in m["content"] or '[SUMMARY]' in m["content"]))
+    )
     
     try:
-        r = requests.post("http://localhost:11434/api/chat", 
-                          json={"model": "mistral", "messages": temp_messages, "stream": False})
-        response = r.json()["message"]["content"].strip().replace('-', '')
+        # Streaming : le flux est coupé dès que la première phrase est complète
+        response = first_sentence(llm.stream_chat(temp_messages))
+        report_prompt_eval()
+        response = response.replace('-', '')
         
         if response.startswith("[SUMMARY]"):
             return "[SUMMARY_REQUESTED]"
         
-        # Extraire première phrase
-        match = re.search(r'[.?\n]', response)
-        response = response[:match.end()].strip() if match else response.strip()
         response = response.rstrip('.') + '?' if not response.endswith('?') else response
         
         # Valider et utiliser fallback si nécessaire
@@ -255,23 +282,33 @@ def generate_medical_question(messages):
             evaluation_metrics["llm_questions_fallback"] += 1 # ⬅️ Métrique : Question corrigée
             return PQRST_FALLBACK[question_counter % 6]
             
-    except Exception as e:
-        return f"Error: {str(e)}"
+    except LLMUnavailable as e:
+        # Serveur indisponible (ou disjoncteur ouvert) : fallback immédiat
+        print(f"⚠️ LLM Error: {e}")
+        evaluation_metrics["llm_questions_fallback"] += 1
+        return PQRST_FALLBACK[question_counter % 6]
 
 # --- MAIN PROCESS ---
 def process_audio_thread():
     global conversation_phase, question_counter
     
-    while is_speaking:
-        root.after(100)
+    # Ne pas enregistrer la voix de l'assistant (borné : jamais de blocage définitif)
+    if not tts.wait_idle(TTS_IDLE_TIMEOUT):
+        print("⚠️ TTS still busy, recording anyway")
     
     record_button.config(text="● Recording...", bg="#d9534f", state="disabled")
     report_button.config(state="disabled")
     root.update()
     
     start_time = time.time() # ⬅️ Début du chronométrage pour la latence
-    filename = record_audio()
-    patient_text = model.transcribe(filename, language="en")["text"].strip()
+    audio = record_audio()
+    if audio is None:
+        # Rien à transcrire : on rend la main au patient
+        record_button.config(text="🎤 Speak", bg="#0275d8", state="normal")
+        report_button.config(state="normal")
+        return
+    evaluation_metrics["capture_latencies"].append(time.time() - start_time)
+    patient_text = model.transcribe(audio, language="en")["text"].strip()
     print(f"\nPatient: {patient_text}")
     
     messages.append({"role": "user", "content": patient_text})
@@ -288,13 +325,15 @@ def process_audio_thread():
     
     end_time = time.time()
     evaluation_metrics["latencies"].append(end_time - start_time) # ⬅️ Enregistrement de la latence
+    if len(evaluation_metrics["latencies"]) == 1:
+        print(f"[STARTUP] first_turn latency: {end_time - start_time:.2f} s")
 
     if doctor_text == "[SUMMARY_REQUESTED]":
         print("\n🛑 Consultation concluded")
         generate_summary()
         final_msg = display_evaluation() # ⬅️ Génère et affiche les métriques d'évaluation
         response_label.config(text=f"Consultation complète! {final_msg}")
-        threading.Thread(target=speak_text, args=("Consultation complete! Your report is being sent to your doctor. Wishing you a speedy recovery!",), daemon=True).start()
+        speak_text(CLOSING_MSG)
         record_button.config(text="✅ FINISHED", bg="#28a745", state="disabled")
         report_button.config(state="disabled")
         return
@@ -302,7 +341,7 @@ def process_audio_thread():
     print(f"Doctor: {doctor_text}")
     response_label.config(text=doctor_text)
     messages.append({"role": "assistant", "content": doctor_text})
-    threading.Thread(target=speak_text, args=(doctor_text,), daemon=True).start()
+    speak_text(doctor_text)
     
     record_button.config(text="🎤 Speak", bg="#0275d8", state="normal")
     report_button.config(state="normal")
@@ -327,10 +366,10 @@ def generate_summary():
     }
     
     try:
-        r = requests.post("http://localhost:11434/api/chat",
-                          json={"model": "mistral", "messages": [summary_prompt, {"role": "user", "content": conversation}], "stream": False})
-        summary = r.json()["message"]["content"].strip()
-    except:
+        summary = llm.chat([summary_prompt, {"role": "user", "content": conversation}],
+                           timeout=(2.0, 120.0))
+    except LLMUnavailable as e:
+        print(f"Summary generation error: {e}")
         summary = "Error generating summary"
     
     with open("patient_medical_report.txt", "w", encoding="utf-8") as f:
@@ -343,12 +382,39 @@ def generate_summary():
     
     print("\n📝 Report saved to 'patient_medical_report.txt'")
 
+# --- STARTUP (chargement différé) ---
+def load_asr():
+    global model
+    model = load_engine()  # ASR_BACKEND / ASR_MODEL (défaut : whisper medium)
+
+def warm_asr():
+    # Inférence factice : le coût JIT / allocations n'est plus payé au 1er tour
+    model.transcribe(np.zeros(RATE, dtype=np.float32), language="en")
+
+def warm_llm():
+    # Requête sans message : Ollama charge le modèle en mémoire sans générer
+    llm.chat([], timeout=(2.0, 120.0))
+
+def on_engines_ready():
+    root.after(0, lambda: record_button.config(text="🎤 Speak", bg="#0275d8", state="normal"))
+
+def on_engines_error(name, e):
+    root.after(0, lambda: response_label.config(text=f"Startup error ({name}): {e}"))
+
 # --- NOUVELLE FONCTION: AFFICHAGE DE L'ÉVALUATION ---
 def display_evaluation():
     
     # Calcul des moyennes
     num_latencies = len(evaluation_metrics["latencies"])
     avg_latency = sum(evaluation_metrics["latencies"]) / num_latencies if num_latencies > 0 else 0
+    median_latency = statistics.median(evaluation_metrics["latencies"]) if num_latencies > 0 else 0
+    num_capture = len(evaluation_metrics["capture_latencies"])
+    median_capture = statistics.median(evaluation_metrics["capture_latencies"]) if num_capture > 0 else 0
+    prompt_tokens = [e["prompt_tokens"] for e in evaluation_metrics["prompt_evals"] if e.get("prompt_tokens") is not None]
+    prompt_ms = [e["prompt_ms"] for e in evaluation_metrics["prompt_evals"] if e.get("prompt_ms") is not None]
+    avg_prompt_tokens = f"{sum(prompt_tokens) / len(prompt_tokens):.0f} tokens" if prompt_tokens else "n/a tokens"
+    avg_prompt_ms = f"{sum(prompt_ms) / len(prompt_ms):.0f} ms" if prompt_ms else "n/a ms"
+    median_tts_start = statistics.median(tts.start_latencies) if tts.start_latencies else 0
     
     valid_count = evaluation_metrics["llm_questions_valid"]
     fallback_count = evaluation_metrics["llm_questions_fallback"]
@@ -367,7 +433,15 @@ def display_evaluation():
         
         f.write("### 1. PERFORMANCE TECHNIQUE ###\n")
         f.write(f"• Latence Moyenne (temps de réponse complet) : **{avg_latency:.2f} s**\n")
+        f.write(f"• Latence Médiane (temps de réponse complet) : **{median_latency:.2f} s**\n")
+        f.write(f"• Durée Médiane d'enregistrement ({'VAD' if STREAMING_CAPTURE else 'fixe'}) : **{median_capture:.2f} s**\n")
         f.write(f"• Nombre total d'interactions chronométrées : {num_latencies}\n")
+        f.write(f"• Démarrage de la voix (médiane) : {median_tts_start * 1000:.0f} ms ({tts.engine.name})\n")
+        f.write(f"• Évaluation du prompt LLM par tour : {avg_prompt_tokens}, {avg_prompt_ms} (moyenne)\n")
+        f.write(f"• Démarrage : UI affichée en {startup.timings.get('ui_shown', 0):.2f} s, "
+                f"moteurs prêts en {startup.timings.get('engines_ready', 0):.2f} s\n")
+        if num_latencies > 0:
+            f.write(f"• Latence du premier tour : {evaluation_metrics['latencies'][0]:.2f} s\n")
         f.write("\n" + "-"*50 + "\n")
 
         f.write("### 2. EFFICACITÉ DU DIALOGUE ###\n")
@@ -405,9 +479,10 @@ tk.Label(root, text="Intelligent Medical Assistant", bg="#f5f7fa", fg="#2a3f54",
 button_frame = tk.Frame(root, bg="#f5f7fa")
 button_frame.pack(pady=10)
 
-record_button = tk.Button(button_frame, text="🎤 Speak",
+record_button = tk.Button(button_frame, text="⏳ Loading...",
                              command=lambda: threading.Thread(target=process_audio_thread, daemon=True).start(),
-                             bg="#0275d8", fg="white", font=("Arial", 14), width=15, height=1)
+                             bg="#6c757d", fg="white", font=("Arial", 14), width=15, height=1,
+                             state="disabled")  # Activé quand les moteurs sont prêts
 record_button.pack(side="left", padx=10)
 
 report_button = tk.Button(button_frame, text="📄 Generate Report", command=generate_report_manually,
@@ -421,8 +496,15 @@ response_label = tk.Label(frame, text="", bg="white", fg="#333", wraplength=480,
                              justify="left", font=("Arial", 12), anchor="nw")
 response_label.pack(padx=10, pady=10, fill="both", expand=True)
 
-initial_msg = "Hello! Could you please tell me your full name for my records?"
-response_label.config(text=initial_msg)
-threading.Thread(target=speak_text, args=(initial_msg,), daemon=True).start()
+response_label.config(text=INITIAL_MSG)
+speak_text(INITIAL_MSG)
+
+startup.on_ready = on_engines_ready
+startup.on_error = on_engines_error
+startup.add("asr_load", load_asr)
+startup.add("asr_warmup", warm_asr)
+startup.add("llm_warmup", warm_llm, required=False)
+root.after(0, lambda: startup.mark("ui_shown"))
+startup.start()
 
 root.mainloop()
\ No newline at end of file
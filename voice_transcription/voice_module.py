@@ -1,63 +1,188 @@
 # voice_transcription/voice_module.py
 # ==================================
 # Moteur de transcription vocale silencieux (API multimodale)
-
+#
+# Reconnaissance locale, sans réseau (réseau du service isolé) : moteur
+# en flux d'asr_engine (Vosk par défaut, ou faster-whisper / whisper),
+# alimenté bloc par bloc pendant la capture. is_voice_active() passe à
+# True dès le début de la parole ; l'hypothèse partielle est disponible
+# via get_voice_partial() avant la fin de l'énoncé.
+#
+# Un seul flux micro pour toute la session (MicStream → tampon circulaire) :
+# pas de réouverture PortAudio par énoncé, et l'audio arrivé pendant la
+# fin d'une transcription est segmenté ensuite au lieu d'être perdu.
+#
+# Les transcriptions finales passent toutes par une file bornée (ordre
+# conservé, aucune écrasée entre deux lectures). Avec un bus, un thread
+# pont la vide et publie chaque UserIntent (main.main_loop, worker du
+# superviseur) ; sans bus, on la lit avec get_transcript(timeout) ou
+# get_voice_text().
+
+import os
 import threading
 import time
-import speech_recognition as sr
-
-_recognizer = sr.Recognizer()
-_microphone = sr.Microphone()
 
-_last_voice_text = None
-_voice_active = False
+from shared.protocol import InputMode, UserIntent
+from voice_transcription.asr_engine import load_engine
+from voice_transcription.audio_capture import Endpointer, MicStream
+from voice_transcription.transcript_queue import Transcript, TranscriptQueue
+
+VOICE_ASR_BACKEND = os.environ.get("VOICE_ASR_BACKEND", "vosk")
+VOICE_ASR_MODEL = os.environ.get("VOICE_ASR_MODEL")          # défaut propre au moteur
+VOICE_LANGUAGE = os.environ.get("VOICE_LANGUAGE", "fr")
+
+_engine = None
+_mic = None
+_endpointer = None
+_blocks_before = 0              # blocs consommés par les Endpointer précédents (micro rouvert)
+_transcripts = TranscriptQueue(64)
+_partial_text = ""
+_voice_active = False           # parole en cours (début détecté, transcription non terminée)
 _lock = threading.Lock()
+_intent_bus = None
 
 
-def _voice_loop():
-    global _last_voice_text, _voice_active
+def _set_state(active, partial=None):
+    global _voice_active, _partial_text
+    with _lock:
+        _voice_active = active
+        if partial is not None:
+            _partial_text = partial
 
-    with _microphone as source:
-        _recognizer.adjust_for_ambient_noise(source)
 
-    while True:
-        try:
-            with _microphone as source:
-                _voice_active = False
-                audio = _recognizer.listen(
-                    source,
-                    timeout=1,
-                    phrase_time_limit=4
-                )
+def _listen_once():
+    """Un énoncé : segmentation + décodage en flux ; retourne (texte, confiance, début) ou None"""
+    stream = None
+
+    def on_start(onset):
+        nonlocal stream
+        # Début de parole : actif sans attendre la transcription
+        stream = _engine.stream(language=VOICE_LANGUAGE)
+        _set_state(True)
 
-            text = _recognizer.recognize_google(audio, language="fr-FR")
+    def on_block(audio):
+        partial = stream.accept(audio)
+        if partial is not None:
+            _set_state(True, partial)
 
-            with _lock:
-                _last_voice_text = text
-                _voice_active = True
+    heard = _endpointer.listen(on_start, on_block)
+    if heard is None:
+        return None
+    _, _, onset = heard
+    result = stream.finish()
+    return result["text"], result.get("confidence", 1.0), onset
 
-        except sr.WaitTimeoutError:
-            _voice_active = False
-        except sr.UnknownValueError:
-            _voice_active = False
-        except Exception:
-            _voice_active = False
 
-        time.sleep(0.1)
+def _open_microphone():
+    global _mic, _endpointer, _blocks_before
+    if _mic is not None:
+        _mic.close()
+    if _endpointer is not None:
+        _blocks_before += _endpointer.blocks
+    _mic = MicStream().start()
+    _endpointer = Endpointer(_mic.ring, max_duration=4.0)
 
 
-def start_voice_recognition():
+def _voice_loop():
+    global _engine
+
+    _engine = load_engine(VOICE_ASR_BACKEND, VOICE_ASR_MODEL)
+    print(f"[VOICE] Local ASR ready ({_engine.name}, {VOICE_LANGUAGE})")
+
+    while True:
+        try:
+            if _mic is None or not _mic.is_active():
+                _open_microphone()
+            heard = _listen_once()
+        except Exception as e:
+            # Micro débranché, périphérique occupé... : on signale et on rouvre
+            _set_state(False, "")
+            print(f"[VOICE] Capture / ASR error: {e}")
+            if _mic is not None:
+                _mic.close()
+            time.sleep(1.0)
+            continue
+
+        if heard is None or not heard[0]:
+            _set_state(False, "")
+            continue
+
+        text, confidence, onset = heard
+        # Horodatée à la fin de la transcription : c'est à partir de là que
+        # la voix préempte le regard (hold du ModeManager)
+        if not _transcripts.put(Transcript(text, confidence, onset)):
+            print(f"[VOICE] Transcript queue full, dropped: {text!r}")
+        _set_state(False, "")
+
+
+def _publish_loop():
+    """Pont file → bus : seul consommateur de la file quand un bus est attaché"""
+    while True:
+        transcript = _transcripts.get()
+        try:
+            _intent_bus.publish(UserIntent(
+                mode=InputMode.VOICE,
+                content=transcript.text,
+                confidence=transcript.confidence,
+                monotonic=transcript.monotonic,
+                source="voice"
+            ))
+        except Exception as e:
+            print(f"[VOICE] Publish error, dropped {transcript.text!r}: {e}")
+
+
+def start_voice_recognition(bus=None):
+    global _intent_bus
+    _intent_bus = bus
+    if bus is not None:
+        threading.Thread(target=_publish_loop, daemon=True).start()
     thread = threading.Thread(target=_voice_loop, daemon=True)
     thread.start()
+    return thread
 
 
 def is_voice_active():
-    return _voice_active
+    """Parole en cours ou transcription pas encore lue"""
+    with _lock:
+        return _voice_active or len(_transcripts) > 0
 
 
-def get_voice_text():
-    global _last_voice_text
+def get_voice_partial():
+    """Hypothèse en cours de l'énoncé ("" hors parole)"""
     with _lock:
-        text = _last_voice_text
-        _last_voice_text = None
-    return text
+        return _partial_text
+
+
+def _check_no_bus():
+    # File SPSC : avec un bus, _publish_loop en est le seul consommateur
+    if _intent_bus is not None:
+        raise RuntimeError("voice transcripts are published on the intent bus; "
+                           "subscribe to the bus instead of reading the queue")
+
+
+def get_transcript(timeout=None):
+    """
+    Prochaine transcription (Transcript) dans l'ordre, None si timeout
+    écoulé. Sans bus seulement (RuntimeError sinon) : le pont vers le bus
+    est alors le seul consommateur de la file.
+    """
+    _check_no_bus()
+    return _transcripts.get(timeout)
+
+
+def get_voice_text():
+    """Texte de la prochaine transcription non lue, sans attendre (None si aucune ; sans bus seulement)"""
+    _check_no_bus()
+    transcript = _transcripts.get_nowait()
+    return transcript.text if transcript is not None else None
+
+
+def get_voice_stats():
+    return _transcripts.stats()
+
+
+def get_voice_progress():
+    """Blocs audio consommés par la boucle d'écoute ({} avant l'ouverture du micro)"""
+    if _endpointer is None:
+        return {}
+    return {"audio": _blocks_before + _endpointer.blocks}